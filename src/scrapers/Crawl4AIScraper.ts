@@ -23,7 +23,11 @@ export class Crawl4AIScraper extends BaseScraper {
   private wrapperPath: string;
   private sessionCache: Map<string, any> = new Map();
 
-  constructor() {
+  /**
+   * @param pythonBridge Bridge used to run the wrapper; pass a
+   * PersistentPythonBridge to keep one browser alive across crawls
+   */
+  constructor(pythonBridge?: PythonBridge) {
     super(ScraperType.CRAWL4AI, {
       javascript: true,
       cookies: true,
@@ -33,7 +37,7 @@ export class Crawl4AIScraper extends BaseScraper {
       multiPage: true
     });
 
-    this.pythonBridge = new PythonBridge();
+    this.pythonBridge = pythonBridge || new PythonBridge();
     this.wrapperPath = path.join(__dirname, 'python_wrappers', 'crawl4ai_wrapper.py');
   }
 
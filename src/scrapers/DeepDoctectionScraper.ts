@@ -18,7 +18,11 @@ export class DeepDoctectionScraper extends BaseScraper {
   private pythonBridge: PythonBridge;
   private wrapperPath: string;
 
-  constructor() {
+  /**
+   * @param pythonBridge Bridge used to run the wrapper; pass a
+   * PersistentPythonBridge to keep the loaded models resident across documents
+   */
+  constructor(pythonBridge?: PythonBridge) {
     super(ScraperType.DEEPDOCTECTION, {
       javascript: false,
       cookies: false,
@@ -28,7 +32,7 @@ export class DeepDoctectionScraper extends BaseScraper {
       multiPage: true  // Can handle multi-page documents
     });
 
-    this.pythonBridge = new PythonBridge();
+    this.pythonBridge = pythonBridge || new PythonBridge();
     // Use v2 wrapper with better compatibility
     this.wrapperPath = path.join(__dirname, 'python_wrappers', 'deepdoctection_wrapper_v2.py');
   }
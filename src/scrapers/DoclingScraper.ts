@@ -21,7 +21,11 @@ export class DoclingScraper extends BaseScraper {
   private wrapperPath: string;
   private documentCache: Map<string, Buffer> = new Map();
 
-  constructor() {
+  /**
+   * @param pythonBridge Bridge used to run the wrapper; pass a
+   * PersistentPythonBridge to keep Docling and its models loaded across documents
+   */
+  constructor(pythonBridge?: PythonBridge) {
     super(ScraperType.DOCLING, {
       javascript: false,
       cookies: false,
@@ -31,7 +35,7 @@ export class DoclingScraper extends BaseScraper {
       multiPage: false
     });
 
-    this.pythonBridge = new PythonBridge();
+    this.pythonBridge = pythonBridge || new PythonBridge();
     this.wrapperPath = path.join(__dirname, 'python_wrappers', 'docling_wrapper.py');
   }
 
@@ -54,6 +58,7 @@ export class DoclingScraper extends BaseScraper {
       // Prepare configuration for Python wrapper
       const pythonConfig = {
         document_data: documentBuffer.toString('base64'),
+        document_encoding: 'base64',
         document_url: url,
         options: this.buildDoclingOptions(params)
       };
@@ -114,6 +119,8 @@ export class DoclingScraper extends BaseScraper {
   private buildDoclingOptions(params: DoclingParameters): any {
     return {
       format: params.format,
+      // Only the representation extractContent reads is built and sent back
+      export_formats: [params.format || 'markdown'],
       ocr: params.ocr,
       ocr_engine: params.ocrEngine,
       table_structure: params.tableStructure,
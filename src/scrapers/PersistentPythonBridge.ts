@@ -0,0 +1,211 @@
+/**
+ * Persistent Python bridge that keeps wrapper processes alive between calls
+ * Single Responsibility: Exchange newline-delimited JSON with long-lived Python workers
+ */
+
+import { spawn, ChildProcess } from 'child_process';
+import { PythonBridge, PythonBridgeOptions, PythonExecutionResult } from './PythonBridge';
+
+interface PendingRequest {
+  resolve: (result: PythonExecutionResult) => void;
+  startTime: number;
+  timeoutMs: number;
+  timeoutId?: NodeJS.Timeout;
+}
+
+interface PythonWorker {
+  child: ChildProcess;
+  buffer: string;
+  stderr: string;
+  pending: PendingRequest[];
+}
+
+/**
+ * Drop-in replacement for PythonBridge.execute that spawns each wrapper once
+ * with `--serve` and streams requests to it, so Python startup, library
+ * imports and browser/model initialization are paid only on the first call.
+ *
+ * The Crawl4AI wrapper also accepts `serveFlag: '--server'`, which keeps a
+ * forkserver parent with crawl4ai preloaded and forks one isolated worker
+ * per request instead of sharing a single browser.
+ */
+export class PersistentPythonBridge extends PythonBridge {
+  private readonly serveFlag: string;
+  private readonly workers: Map<string, PythonWorker> = new Map();
+
+  constructor(options: PythonBridgeOptions & { serveFlag?: string } = {}) {
+    super(options);
+    this.serveFlag = options.serveFlag || '--serve';
+  }
+
+  /**
+   * Send the first argument as one JSON line to the script's worker and
+   * resolve with the matching JSON line it writes back
+   */
+  async execute<T = any>(
+    scriptPath: string,
+    args: any[] = [],
+    options: { timeout?: number } = {}
+  ): Promise<PythonExecutionResult<T>> {
+    const startTime = Date.now();
+    const timeoutMs = options.timeout || this.timeout;
+
+    let worker: PythonWorker;
+    try {
+      worker = this.getWorker(scriptPath);
+    } catch (error) {
+      return {
+        success: false,
+        error: `Failed to spawn Python process: ${error instanceof Error ? error.message : String(error)}`,
+        exitCode: -1,
+        executionTime: Date.now() - startTime
+      };
+    }
+
+    return new Promise((resolve) => {
+      const request: PendingRequest = { resolve, startTime, timeoutMs };
+
+      worker.pending.push(request);
+      if (worker.pending.length === 1) {
+        this.startTimer(scriptPath, request);
+      }
+      worker.child.stdin?.write(JSON.stringify(args[0] ?? {}) + '\n');
+    });
+  }
+
+  /**
+   * Stop every worker process started by this bridge
+   */
+  async close(): Promise<void> {
+    for (const scriptPath of Array.from(this.workers.keys())) {
+      this.terminateWorker(scriptPath, 'Python bridge closed');
+    }
+  }
+
+  /**
+   * Number of worker processes currently alive
+   */
+  getWorkerCount(): number {
+    return this.workers.size;
+  }
+
+  private getWorker(scriptPath: string): PythonWorker {
+    const existing = this.workers.get(scriptPath);
+    if (existing) {
+      return existing;
+    }
+
+    const child = spawn(this.pythonPath, [scriptPath, this.serveFlag], {
+      cwd: this.workingDirectory,
+      env: this.environment,
+      stdio: ['pipe', 'pipe', 'pipe']
+    });
+
+    const worker: PythonWorker = { child, buffer: '', stderr: '', pending: [] };
+    this.workers.set(scriptPath, worker);
+
+    // Decode as a stream so multi-byte characters split across chunks stay intact
+    child.stdout?.setEncoding('utf8');
+    child.stderr?.setEncoding('utf8');
+
+    child.stdout?.on('data', (data: string) => {
+      worker.buffer += data;
+
+      let newlineIndex: number;
+      while ((newlineIndex = worker.buffer.indexOf('\n')) !== -1) {
+        const line = worker.buffer.slice(0, newlineIndex).trim();
+        worker.buffer = worker.buffer.slice(newlineIndex + 1);
+        if (line) {
+          this.handleLine(scriptPath, worker, line);
+        }
+      }
+    });
+
+    child.stderr?.on('data', (data: string) => {
+      worker.stderr += data;
+    });
+
+    child.on('close', (code: number | null) => {
+      this.failPending(scriptPath, worker, `Python script exited with code ${code}`, code ?? -1);
+    });
+
+    child.on('error', (error: Error) => {
+      this.failPending(scriptPath, worker, `Failed to spawn Python process: ${error.message}`, -1);
+    });
+
+    return worker;
+  }
+
+  /**
+   * Start the timeout of the request the worker is now processing; queued
+   * requests only start counting once everything ahead of them is answered
+   */
+  private startTimer(scriptPath: string, request: PendingRequest): void {
+    request.timeoutId = setTimeout(() => {
+      // Responses are matched by order, so a stuck worker cannot be reused
+      this.terminateWorker(scriptPath, `Python script timed out after ${request.timeoutMs}ms`);
+    }, request.timeoutMs);
+  }
+
+  private handleLine(scriptPath: string, worker: PythonWorker, line: string): void {
+    const request = worker.pending.shift();
+    if (!request) {
+      return;
+    }
+
+    clearTimeout(request.timeoutId);
+    if (worker.pending.length > 0) {
+      this.startTimer(scriptPath, worker.pending[0]);
+    }
+    const executionTime = Date.now() - request.startTime;
+    const stderr = worker.stderr || undefined;
+    worker.stderr = '';
+
+    try {
+      request.resolve({
+        success: true,
+        data: JSON.parse(line),
+        stderr,
+        exitCode: 0,
+        executionTime
+      });
+    } catch (parseError) {
+      request.resolve({
+        success: false,
+        error: `Failed to parse Python output as JSON: ${parseError instanceof Error ? parseError.message : String(parseError)}`,
+        stderr: stderr || line,
+        exitCode: 0,
+        executionTime
+      });
+    }
+  }
+
+  private terminateWorker(scriptPath: string, error: string): void {
+    const worker = this.workers.get(scriptPath);
+    if (!worker) {
+      return;
+    }
+
+    this.failPending(scriptPath, worker, error, -1);
+    worker.child.stdin?.end();
+    worker.child.kill('SIGTERM');
+  }
+
+  private failPending(scriptPath: string, worker: PythonWorker, error: string, exitCode: number): void {
+    if (this.workers.get(scriptPath) === worker) {
+      this.workers.delete(scriptPath);
+    }
+
+    const pending = worker.pending.splice(0);
+    for (const request of pending) {
+      clearTimeout(request.timeoutId);
+      request.resolve({
+        success: false,
+        error,
+        stderr: worker.stderr,
+        exitCode,
+        executionTime: Date.now() - request.startTime
+      });
+    }
+  }
+}
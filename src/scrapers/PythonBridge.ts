@@ -25,10 +25,10 @@ export interface PythonExecutionResult<T = any> {
 }
 
 export class PythonBridge {
-  private readonly pythonPath: string;
-  private readonly timeout: number;
-  private readonly workingDirectory: string;
-  private readonly environment: Record<string, string>;
+  protected readonly pythonPath: string;
+  protected readonly timeout: number;
+  protected readonly workingDirectory: string;
+  protected readonly environment: Record<string, string>;
 
   constructor(options: PythonBridgeOptions = {}) {
     // Use virtual environment Python by default
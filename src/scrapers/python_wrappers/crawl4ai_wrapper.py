@@ -7,70 +7,281 @@ Handles web crawling using the Crawl4AI library
 import sys
 import json
 import asyncio
+import functools
+import importlib
 import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 import base64
 import os
-from contextlib import redirect_stdout, redirect_stderr
-import io
+import tempfile
+import logging
+import re
+
+# Keep library logging off the JSON channel
+logging.getLogger('crawl4ai').setLevel(logging.ERROR)
+logging.getLogger('playwright').setLevel(logging.ERROR)
+
+# HTML fields larger than this are written to stream_dir instead of stdout
+STREAM_THRESHOLD_BYTES = 64 * 1024
+HTML_FIELDS = ("html", "cleaned_html", "fit_html")
+
+# Matches crawl4ai errors about a deprecated LLM provider argument
+DEPRECATED_PROVIDER_RE = re.compile(r"deprecated.*provider|provider.*deprecated", re.IGNORECASE | re.DOTALL)
+
+# Sentinel for attributes absent from a result's instance dict
+_MISSING = object()
+
+# Result fields a caller can select with config["include_fields"]
+CONTENT_FIELDS = ("html", "cleaned_html", "markdown", "extracted_content", "fit_markdown", "fit_html")
+OPTIONAL_RESULT_FIELDS = CONTENT_FIELDS + ("metadata", "links", "images", "media")
+
+# Started browsers kept by a --serve process; the least recently used one is
+# closed when a new crawler config would exceed this
+MAX_CACHED_CRAWLERS = 4
+
+# Errors meaning the crawler's browser is gone and must not be reused
+BROWSER_CLOSED_RE = re.compile(
+    r"target (page, context or browser )?(has been )?closed|browser has been closed|"
+    r"browser (has )?disconnected|connection closed",
+    re.IGNORECASE
+)
+
+# Connection pool defaults for the browserless HTTP crawler strategy
+HTTP_MAX_CONNECTIONS = 128
+HTTP_DNS_CACHE_TTL = 300
+
+# Crawl options forwarded unchanged to crawler.arun
+PASSTHROUGH_PARAMS = (
+    "word_count_threshold",
+    "css_selector",
+    "screenshot",
+    "user_agent",
+    "headers",
+    "wait_for",
+    "page_timeout",
+    "delay_before_return_html",
+    "js_code",
+    "remove_overlay_elements",
+    "simulate_user",
+    "override_navigator",
+    "magic",
+    "session_id",
+    "cache_mode",
+    "excluded_tags",
+    "only_text",
+    "process_iframes",
+    "remove_forms",
+    "social_media_links",
+    "social_media_domains",
+)
+
+# Fast JSON codec for large crawl payloads; stdlib json is the fallback
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 try:
     from crawl4ai import AsyncWebCrawler
     CRAWL4AI_AVAILABLE = True
 
-    # Try to import optional features
+    # arun() may wrap results in a container rather than returning a list
     try:
-        from crawl4ai.extraction_strategy import (
-            LLMExtractionStrategy,
-            CosineStrategy,
-        )
-        EXTRACTION_STRATEGIES_AVAILABLE = True
+        from crawl4ai.models import CrawlResultContainer
+        RESULT_SEQUENCE_TYPES = (list, tuple, CrawlResultContainer)
     except ImportError:
-        EXTRACTION_STRATEGIES_AVAILABLE = False
+        RESULT_SEQUENCE_TYPES = (list, tuple)
 
-    try:
-        from crawl4ai.extraction_strategy import RegexExtractionStrategy
-        REGEX_EXTRACTION_AVAILABLE = True
-    except ImportError:
-        REGEX_EXTRACTION_AVAILABLE = False
+except ImportError as e:
+    CRAWL4AI_AVAILABLE = False
+    IMPORT_ERROR = str(e)
+    RESULT_SEQUENCE_TYPES = (list, tuple)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_optional(module: str, name: str) -> Any:
+    """
+    Import an optional crawl4ai class on first use so strategies that pull in
+    tokenizers/numpy are only loaded when a request actually asks for them
 
+    Returns:
+        The class, or None when this crawl4ai version doesn't provide it
+    """
     try:
-        from crawl4ai.chunking_strategy import RegexChunking
-        REGEX_CHUNKING_AVAILABLE = True
-    except ImportError:
-        REGEX_CHUNKING_AVAILABLE = False
+        return getattr(importlib.import_module(module), name)
+    except (ImportError, AttributeError):
+        return None
+
 
+def _loads(data: str) -> Any:
+    """Parse a JSON config"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _write_result(result: Dict[str, Any]):
+    """Write one result as a single UTF-8 JSON line on the real stdout"""
+    out = sys.__stdout__
+    if ORJSON_AVAILABLE:
+        try:
+            payload = orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            payload = json.dumps(result, ensure_ascii=False, indent=None).encode('utf-8')
+        out.flush()
+        out.buffer.write(payload)
+        out.buffer.write(b"\n")
+    else:
+        out.write(json.dumps(result, ensure_ascii=False, indent=None))
+        out.write("\n")
+    out.flush()
+
+
+# Stateless strategy objects are cached by their (hashable) arguments so
+# repeated crawls with the same extraction setup reuse one instance; list/dict
+# arguments are passed as JSON strings to keep them hashable.
+STRATEGY_CACHE_SIZE = 64
+
+
+def _build_llm_strategy(provider: str, api_token: Optional[str], instruction: str, schema: Any) -> Any:
+    """
+    Build an LLMExtractionStrategy, or None if unavailable or neither constructor
+    format is accepted. Never cached: the strategy accumulates token usage per
+    instance, which must not carry over between requests.
+    """
+    LLMExtractionStrategy = _load_optional("crawl4ai.extraction_strategy", "LLMExtractionStrategy")
+    if LLMExtractionStrategy is None:
+        return None
+
+    # Try new LLMConfig format first, fall back to old format if it fails
     try:
-        from crawl4ai.content_filter import (
-            BM25ContentFilter,
-            PruningContentFilter
+        from crawl4ai.models import LLMConfig
+        return LLMExtractionStrategy(
+            llm_config=LLMConfig(provider=provider, api_token=api_token),
+            instruction=instruction,
+            schema=schema
         )
-        CONTENT_FILTERS_AVAILABLE = True
-    except ImportError:
-        CONTENT_FILTERS_AVAILABLE = False
-
-except ImportError as e:
-    CRAWL4AI_AVAILABLE = False
-    IMPORT_ERROR = str(e)
-    EXTRACTION_STRATEGIES_AVAILABLE = False
-    REGEX_EXTRACTION_AVAILABLE = False
-    REGEX_CHUNKING_AVAILABLE = False
-    CONTENT_FILTERS_AVAILABLE = False
+    except (ImportError, TypeError, AttributeError):
+        # Fallback to old format for older versions or if new format fails
+        try:
+            return LLMExtractionStrategy(
+                provider=provider,
+                api_token=api_token,
+                instruction=instruction,
+                schema=schema
+            )
+        except TypeError:
+            # If both fail, skip extraction strategy
+            return None
+
+
+@functools.lru_cache(maxsize=STRATEGY_CACHE_SIZE)
+def _build_cosine_strategy(semantic_filter: str, word_count_threshold: int, max_dist: float,
+                           linkage_method: str, top_k: int) -> Any:
+    """Build a CosineStrategy, or None if unavailable"""
+    CosineStrategy = _load_optional("crawl4ai.extraction_strategy", "CosineStrategy")
+    if CosineStrategy is None:
+        return None
+    return CosineStrategy(
+        semantic_filter=semantic_filter,
+        word_count_threshold=word_count_threshold,
+        max_dist=max_dist,
+        linkage_method=linkage_method,
+        top_k=top_k
+    )
+
+
+@functools.lru_cache(maxsize=STRATEGY_CACHE_SIZE)
+def _build_regex_strategy(patterns_json: str) -> Any:
+    """Build a RegexExtractionStrategy, or None if unavailable"""
+    RegexExtractionStrategy = _load_optional("crawl4ai.extraction_strategy", "RegexExtractionStrategy")
+    if RegexExtractionStrategy is None:
+        return None
+    return RegexExtractionStrategy(patterns=json.loads(patterns_json))
+
+
+@functools.lru_cache(maxsize=STRATEGY_CACHE_SIZE)
+def _build_regex_chunking(patterns_json: str) -> Any:
+    """Build a RegexChunking strategy, or None if unavailable"""
+    RegexChunking = _load_optional("crawl4ai.chunking_strategy", "RegexChunking")
+    if RegexChunking is None:
+        return None
+    return RegexChunking(patterns=json.loads(patterns_json))
+
+
+@functools.lru_cache(maxsize=STRATEGY_CACHE_SIZE)
+def _build_bm25_filter(user_query: str, bm25_threshold: float) -> Any:
+    """Build a BM25ContentFilter, or None if unavailable"""
+    BM25ContentFilter = _load_optional("crawl4ai.content_filter", "BM25ContentFilter")
+    if BM25ContentFilter is None:
+        return None
+    return BM25ContentFilter(user_query=user_query, bm25_threshold=bm25_threshold)
+
+
+@functools.lru_cache(maxsize=STRATEGY_CACHE_SIZE)
+def _build_pruning_filter(threshold: float, threshold_type: str, min_word_threshold: int) -> Any:
+    """Build a PruningContentFilter, or None if unavailable"""
+    PruningContentFilter = _load_optional("crawl4ai.content_filter", "PruningContentFilter")
+    if PruningContentFilter is None:
+        return None
+    return PruningContentFilter(
+        threshold=threshold,
+        threshold_type=threshold_type,
+        min_word_threshold=min_word_threshold
+    )
 
 
 class Crawl4AIWrapper:
     """Wrapper for Crawl4AI functionality"""
 
     def __init__(self):
-        self.crawler = None
+        # Started crawlers kept alive in serve mode, keyed by crawler config and
+        # ordered from least to most recently used
+        self.crawlers: "OrderedDict[str, Any]" = OrderedDict()
 
     async def crawl(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Execute web crawling with Crawl4AI
+        Execute web crawling with Crawl4AI using a one-off crawler
+
+        Args:
+            config: Crawling configuration containing url (or urls), options, etc.
+
+        Returns:
+            Dictionary with crawling results
+        """
+        if not CRAWL4AI_AVAILABLE:
+            return {
+                "success": False,
+                "error": f"Crawl4AI not available: {IMPORT_ERROR}",
+                "mock": True
+            }
+
+        try:
+            crawler = self._create_crawler(config.get("crawler_config", {}))
+
+            try:
+                await crawler.start()
+                return await self.crawl_with(crawler, config)
+            finally:
+                await crawler.close()
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }
+
+    async def crawl_persistent(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute web crawling on a crawler that stays alive between requests
 
         Args:
-            config: Crawling configuration containing url, options, etc.
+            config: Crawling configuration containing url (or urls), options, etc.
 
         Returns:
             Dictionary with crawling results
@@ -82,6 +293,39 @@ class Crawl4AIWrapper:
                 "mock": True
             }
 
+        try:
+            crawler_config = config.get("crawler_config", {})
+            crawler = await self._get_crawler(crawler_config)
+            result = await self.crawl_with(crawler, config)
+
+            if self._browser_closed(result):
+                # Start a fresh browser for the next request instead of failing forever
+                await self._discard_crawler(crawler_config)
+
+            return result
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }
+
+    async def crawl_with(self, crawler: Any, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Execute web crawling on an existing crawler instance
+
+        Args:
+            crawler: AsyncWebCrawler to run the crawl on
+            config: Crawling configuration containing url (or urls), options, etc.
+
+        Returns:
+            Dictionary with crawling results
+        """
+        urls = config.get("urls")
+        if urls:
+            return await self._crawl_batch(crawler, urls, config)
+
         try:
             url = config.get("url")
             if not url:
@@ -90,43 +334,36 @@ class Crawl4AIWrapper:
                     "error": "URL is required"
                 }
 
-            # Extract crawler and crawl configurations
-            crawler_config = config.get("crawler_config", {})
-            crawl_config = config.get("crawl_config", {})
-
-            # Create crawler instance with verbose disabled
-            crawler_config['verbose'] = False
-            crawler = AsyncWebCrawler(**crawler_config)
+            crawl_config = self._apply_only_text(config.get("crawl_config", {}))
 
             # Prepare crawl parameters
             try:
                 crawl_params = self._prepare_crawl_params(crawl_config)
             except Exception as e:
                 error_msg = str(e)
-                if "deprecated" in error_msg.lower() and "provider" in error_msg.lower():
+                if DEPRECATED_PROVIDER_RE.search(error_msg):
                     # If there's a deprecation error with provider, retry without extraction strategy
-                    crawl_config_no_strategy = {k: v for k, v in crawl_config.items() if k != "extraction_strategy"}
-                    crawl_params = self._prepare_crawl_params(crawl_config_no_strategy)
+                    saved_strategy = crawl_config.pop("extraction_strategy", None)
+                    try:
+                        crawl_params = self._prepare_crawl_params(crawl_config)
+                    finally:
+                        if saved_strategy is not None:
+                            crawl_config["extraction_strategy"] = saved_strategy
                 else:
                     raise
 
-            # Execute crawl with output suppressed
-            # Redirect stdout and stderr to suppress progress messages
-            with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
-                try:
+            # Execute crawl (stray progress output already goes to os.devnull)
+            try:
+                result = await crawler.arun(url, **crawl_params)
+            except Exception as e:
+                # Check if it's a deprecated parameter error
+                error_msg = str(e)
+                if DEPRECATED_PROVIDER_RE.search(error_msg):
+                    # Try without extraction strategy if it's a provider deprecation error
+                    crawl_params.pop("extraction_strategy", None)
                     result = await crawler.arun(url, **crawl_params)
-                except Exception as e:
-                    # Check if it's a deprecated parameter error
-                    error_msg = str(e)
-                    if "deprecated" in error_msg.lower() and "provider" in error_msg.lower():
-                        # Try without extraction strategy if it's a provider deprecation error
-                        crawl_params_no_strategy = {k: v for k, v in crawl_params.items() if k != "extraction_strategy"}
-                        result = await crawler.arun(url, **crawl_params_no_strategy)
-                    else:
-                        raise
-
-                # Close crawler
-                await crawler.close()
+                else:
+                    raise
 
             # Process and return result
             return self._process_result(result, config)
@@ -138,207 +375,470 @@ class Crawl4AIWrapper:
                 "traceback": traceback.format_exc()
             }
 
+    async def _crawl_batch(self, crawler: Any, urls: List[str], config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Crawl several URLs on one crawler with bounded concurrency
+
+        Args:
+            crawler: AsyncWebCrawler shared across the whole batch
+            urls: URLs to crawl
+            config: Shared crawling configuration applied to every URL
+
+        Returns:
+            Dictionary with one processed result per URL
+        """
+        try:
+            crawl_params = self._prepare_crawl_params(self._apply_only_text(config.get("crawl_config", {})))
+
+            # Bound concurrent browser pages so large batches don't collapse into timeouts
+            semaphore = asyncio.Semaphore(config.get("max_concurrency", 16))
+
+            async def crawl_one(url: str):
+                async with semaphore:
+                    return await crawler.arun(url, **crawl_params)
+
+            results = await asyncio.gather(
+                *[crawl_one(url) for url in urls],
+                return_exceptions=True
+            )
+
+            def process_one(url: str, result: Any) -> Dict[str, Any]:
+                if isinstance(result, BaseException):
+                    # Keep the batch alive; report the failure for this URL only
+                    return {
+                        "success": False,
+                        "url": url,
+                        "error": str(result)
+                    }
+                return self._process_result(result, config)
+
+            # _process_result keeps no shared state, and base64/file writes release the GIL
+            workers = min(len(urls), os.cpu_count() or 1)
+            if workers > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    processed = list(executor.map(process_one, urls, results))
+            else:
+                processed = [process_one(url, result) for url, result in zip(urls, results)]
+
+            return {
+                "success": True,
+                "results": processed
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }
+
+    def _create_crawler(self, crawler_config: Dict[str, Any]) -> Any:
+        """
+        Create a crawler instance with verbose disabled
+
+        crawler_config["crawler_strategy"] == "http" selects Crawl4AI's
+        browserless HTTP strategy, whose aiohttp connection pool and DNS cache
+        live as long as the crawler (so for the whole session in serve mode).
+        """
+        crawler_config = dict(crawler_config)
+        crawler_config['verbose'] = False
+
+        strategy = crawler_config.pop("crawler_strategy", None)
+        max_connections = crawler_config.pop("max_connections", HTTP_MAX_CONNECTIONS)
+        dns_cache_ttl = crawler_config.pop("dns_cache_ttl", HTTP_DNS_CACHE_TTL)
+        if strategy == "http":
+            crawler_config["crawler_strategy"] = self._create_http_strategy(max_connections, dns_cache_ttl)
+
+        return AsyncWebCrawler(**crawler_config)
+
+    def _create_http_strategy(self, max_connections: int, dns_cache_ttl: int) -> Any:
+        """Create the pooled HTTP crawler strategy"""
+        try:
+            from crawl4ai.async_crawler_strategy import AsyncHTTPCrawlerStrategy
+        except ImportError:
+            raise ValueError("HTTP crawler strategy is not available in this Crawl4AI version")
+
+        try:
+            return AsyncHTTPCrawlerStrategy(max_connections=max_connections, dns_cache_ttl=dns_cache_ttl)
+        except TypeError:
+            # Older releases don't expose pool tuning
+            return AsyncHTTPCrawlerStrategy()
+
+    async def _get_crawler(self, crawler_config: Dict[str, Any]) -> Any:
+        """Return a started crawler for this configuration, launching it on first use"""
+        key = json.dumps(crawler_config, sort_keys=True)
+
+        crawler = self.crawlers.get(key)
+        if crawler is not None:
+            self.crawlers.move_to_end(key)
+            return crawler
+
+        # Per-request values (headers, user agent, proxy) end up in the key, so
+        # bound the number of browsers instead of keeping one per combination
+        while len(self.crawlers) >= MAX_CACHED_CRAWLERS:
+            _, evicted = self.crawlers.popitem(last=False)
+            await self._close_crawler(evicted)
+
+        crawler = self._create_crawler(crawler_config)
+        await crawler.start()
+        self.crawlers[key] = crawler
+        return crawler
+
+    async def _discard_crawler(self, crawler_config: Dict[str, Any]) -> None:
+        """Drop and close the cached crawler for this configuration"""
+        crawler = self.crawlers.pop(json.dumps(crawler_config, sort_keys=True), None)
+        if crawler is not None:
+            await self._close_crawler(crawler)
+
+    async def _close_crawler(self, crawler: Any) -> None:
+        """Close a crawler, ignoring errors from a browser that is already gone"""
+        try:
+            await crawler.close()
+        except Exception:
+            pass
+
+    def _browser_closed(self, result: Dict[str, Any]) -> bool:
+        """Whether a crawl result reports that the crawler's browser has died"""
+        items = [result, *(result.get("results") or ())]
+        errors = [item.get(key) for item in items for key in ("error", "error_message")]
+        return any(error and BROWSER_CLOSED_RE.search(error) for error in errors)
+
+    async def close(self):
+        """Close every crawler started in serve mode"""
+        crawlers = list(self.crawlers.values())
+        self.crawlers.clear()
+
+        for crawler in crawlers:
+            await self._close_crawler(crawler)
+
+    def _apply_only_text(self, crawl_config: Dict[str, Any]) -> Dict[str, Any]:
+        """In only_text mode, don't ask crawl4ai for output that would be thrown away"""
+        if crawl_config.get("only_text"):
+            crawl_config.setdefault("screenshot", False)
+            crawl_config["word_count_threshold"] = max(crawl_config.get("word_count_threshold") or 0, 1)
+        return crawl_config
+
     def _prepare_crawl_params(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Prepare crawl parameters from configuration"""
-        params = {}
-
         # Basic parameters
-        if "word_count_threshold" in config:
-            params["word_count_threshold"] = config["word_count_threshold"]
-        if "css_selector" in config:
-            params["css_selector"] = config["css_selector"]
-        if "screenshot" in config:
-            params["screenshot"] = config["screenshot"]
-        if "user_agent" in config:
-            params["user_agent"] = config["user_agent"]
-        if "headers" in config:
-            params["headers"] = config["headers"]
-        if "wait_for" in config:
-            params["wait_for"] = config["wait_for"]
-        if "page_timeout" in config:
-            params["page_timeout"] = config["page_timeout"]
-        if "delay_before_return_html" in config:
-            params["delay_before_return_html"] = config["delay_before_return_html"]
-        if "js_code" in config:
-            params["js_code"] = config["js_code"]
-        if "remove_overlay_elements" in config:
-            params["remove_overlay_elements"] = config["remove_overlay_elements"]
-        if "simulate_user" in config:
-            params["simulate_user"] = config["simulate_user"]
-        if "override_navigator" in config:
-            params["override_navigator"] = config["override_navigator"]
-        if "magic" in config:
-            params["magic"] = config["magic"]
-        if "session_id" in config:
-            params["session_id"] = config["session_id"]
-        if "cache_mode" in config:
-            params["cache_mode"] = config["cache_mode"]
-        if "excluded_tags" in config:
-            params["excluded_tags"] = config["excluded_tags"]
-        if "only_text" in config:
-            params["only_text"] = config["only_text"]
-        if "process_iframes" in config:
-            params["process_iframes"] = config["process_iframes"]
-        if "remove_forms" in config:
-            params["remove_forms"] = config["remove_forms"]
-        if "social_media_links" in config:
-            params["social_media_links"] = config["social_media_links"]
-        if "social_media_domains" in config:
-            params["social_media_domains"] = config["social_media_domains"]
+        params = {key: config[key] for key in PASSTHROUGH_PARAMS if key in config}
 
         # Extraction strategy
-        if "extraction_strategy" in config and EXTRACTION_STRATEGIES_AVAILABLE:
+        if "extraction_strategy" in config:
             strategy_config = config["extraction_strategy"]
             strategy_type = strategy_config.get("type", "cosine")
+            strategy = None
 
             if strategy_type == "llm":
-                # Try new LLMConfig format first, fall back to old format if it fails
-                try:
-                    from crawl4ai.models import LLMConfig
-                    params["extraction_strategy"] = LLMExtractionStrategy(
-                        llm_config=LLMConfig(
-                            provider=strategy_config.get("provider", "openai"),
-                            api_token=strategy_config.get("api_token")
-                        ),
-                        instruction=strategy_config.get("instruction", "Extract main content"),
-                        schema=strategy_config.get("schema")
-                    )
-                except (ImportError, TypeError, AttributeError):
-                    # Fallback to old format for older versions or if new format fails
-                    try:
-                        params["extraction_strategy"] = LLMExtractionStrategy(
-                            provider=strategy_config.get("provider", "openai"),
-                            api_token=strategy_config.get("api_token"),
-                            instruction=strategy_config.get("instruction", "Extract main content"),
-                            schema=strategy_config.get("schema")
-                        )
-                    except TypeError:
-                        # If both fail, skip extraction strategy
-                        pass
+                strategy = _build_llm_strategy(
+                    strategy_config.get("provider", "openai"),
+                    strategy_config.get("api_token"),
+                    strategy_config.get("instruction", "Extract main content"),
+                    strategy_config.get("schema")
+                )
             elif strategy_type == "cosine":
-                params["extraction_strategy"] = CosineStrategy(
-                    semantic_filter=strategy_config.get("semantic_filter", ""),
-                    word_count_threshold=strategy_config.get("word_count_threshold", 10),
-                    max_dist=strategy_config.get("max_dist", 0.2),
-                    linkage_method=strategy_config.get("linkage_method", "ward"),
-                    top_k=strategy_config.get("top_k", 3)
+                strategy = _build_cosine_strategy(
+                    strategy_config.get("semantic_filter", ""),
+                    strategy_config.get("word_count_threshold", 10),
+                    strategy_config.get("max_dist", 0.2),
+                    strategy_config.get("linkage_method", "ward"),
+                    strategy_config.get("top_k", 3)
                 )
-            elif strategy_type == "regex" and REGEX_EXTRACTION_AVAILABLE:
-                params["extraction_strategy"] = RegexExtractionStrategy(
-                    patterns=strategy_config.get("patterns", [])
+            elif strategy_type == "regex":
+                strategy = _build_regex_strategy(
+                    json.dumps(strategy_config.get("patterns", []), sort_keys=True)
                 )
 
+            if strategy is not None:
+                params["extraction_strategy"] = strategy
+
         # Chunking strategy
-        if "chunking_strategy" in config and REGEX_CHUNKING_AVAILABLE:
+        if "chunking_strategy" in config:
             chunking_config = config["chunking_strategy"]
             chunking_type = chunking_config.get("type", "regex")
+            chunking = None
 
             if chunking_type == "regex":
-                params["chunking_strategy"] = RegexChunking(
-                    patterns=chunking_config.get("patterns", [r'\n\n'])
+                chunking = _build_regex_chunking(
+                    json.dumps(chunking_config.get("patterns", [r'\n\n']))
                 )
             # Other chunking strategies not available in current version
 
+            if chunking is not None:
+                params["chunking_strategy"] = chunking
+
         # Content filter
-        if "content_filter" in config and CONTENT_FILTERS_AVAILABLE:
+        if "content_filter" in config:
             filter_config = config["content_filter"]
             filter_type = filter_config.get("type", "bm25")
+            content_filter = None
 
             if filter_type == "bm25":
-                params["content_filter"] = BM25ContentFilter(
-                    user_query=filter_config.get("user_query", ""),
-                    bm25_threshold=filter_config.get("bm25_threshold", 1.0)
+                content_filter = _build_bm25_filter(
+                    filter_config.get("user_query", ""),
+                    filter_config.get("bm25_threshold", 1.0)
                 )
             elif filter_type == "pruning":
-                params["content_filter"] = PruningContentFilter(
-                    threshold=filter_config.get("threshold", 0.48),
-                    threshold_type=filter_config.get("threshold_type", "fixed"),
-                    min_word_threshold=filter_config.get("min_word_threshold", 0)
+                content_filter = _build_pruning_filter(
+                    filter_config.get("threshold", 0.48),
+                    filter_config.get("threshold_type", "fixed"),
+                    filter_config.get("min_word_threshold", 0)
                 )
 
+            if content_filter is not None:
+                params["content_filter"] = content_filter
+
         return params
 
     def _process_result(self, result, config) -> Dict[str, Any]:
         """Process crawler result into JSON-serializable format"""
+        # Files written to stream_dir so far, removed again if processing fails
+        stream_paths: List[str] = []
+
         try:
             # Extract the first result from CrawlResult collection
-            first_result = result[0] if hasattr(result, '__getitem__') and len(result) > 0 else result
+            first_result = result[0] if isinstance(result, RESULT_SEQUENCE_TYPES) and result else result
+
+            # Read plain attributes from the instance dict in one go; properties
+            # (e.g. markdown on newer CrawlResult models) fall back to getattr
+            attrs = getattr(first_result, '__dict__', None) or {}
+
+            def field(name: str, default: Any = None) -> Any:
+                value = attrs.get(name, _MISSING)
+                return getattr(first_result, name, default) if value is _MISSING else value
+
+            # Only materialize the fields the caller asked for (all by default)
+            include_fields = set(config.get("include_fields") or OPTIONAL_RESULT_FIELDS)
+            if config.get("crawl_config", {}).get("only_text"):
+                include_fields.difference_update(HTML_FIELDS)
 
             processed = {
-                "success": getattr(first_result, 'success', True),
-                "url": getattr(first_result, 'url', ''),
-                "html": getattr(first_result, 'html', ''),
-                "cleaned_html": getattr(first_result, 'cleaned_html', ''),
-                "markdown": getattr(first_result, 'markdown', ''),
-                "extracted_content": getattr(first_result, 'extracted_content', ''),
-                "fit_markdown": getattr(first_result, 'fit_markdown', ''),
-                "fit_html": getattr(first_result, 'fit_html', ''),
-                "metadata": {},
-                "links": {"internal": [], "external": []},
-                "images": [],
-                "media": {"videos": [], "audios": []},
+                "success": field('success', True),
+                "url": field('url', ''),
                 "screenshot": None,
-                "response_headers": getattr(first_result, 'response_headers', {}),
-                "status_code": getattr(first_result, 'status_code', 200),
-                "session_id": getattr(first_result, 'session_id', config.get('crawl_config', {}).get('session_id')),
-                "error_message": getattr(first_result, 'error_message', None)
+                "response_headers": field('response_headers', {}),
+                "status_code": field('status_code', 200),
+                "session_id": field('session_id', config.get('crawl_config', {}).get('session_id')),
+                "error_message": field('error_message')
             }
 
+            for name in CONTENT_FIELDS:
+                if name in include_fields:
+                    processed[name] = field(name, '')
+
             # Process metadata if available
-            if hasattr(first_result, 'metadata') and first_result.metadata:
-                metadata = first_result.metadata
-                processed["metadata"] = {
-                    "title": metadata.get("title", "") if isinstance(metadata, dict) else getattr(metadata, "title", ""),
-                    "description": metadata.get("description", "") if isinstance(metadata, dict) else getattr(metadata, "description", ""),
-                    "keywords": metadata.get("keywords", []) if isinstance(metadata, dict) else getattr(metadata, "keywords", []),
-                    "author": metadata.get("author", "") if isinstance(metadata, dict) else getattr(metadata, "author", ""),
-                    "language": metadata.get("language", "") if isinstance(metadata, dict) else getattr(metadata, "language", ""),
-                }
+            if "metadata" in include_fields:
+                processed["metadata"] = {}
+                metadata = field('metadata')
+                if metadata:
+                    processed["metadata"] = {
+                        "title": metadata.get("title", "") if isinstance(metadata, dict) else getattr(metadata, "title", ""),
+                        "description": metadata.get("description", "") if isinstance(metadata, dict) else getattr(metadata, "description", ""),
+                        "keywords": metadata.get("keywords", []) if isinstance(metadata, dict) else getattr(metadata, "keywords", []),
+                        "author": metadata.get("author", "") if isinstance(metadata, dict) else getattr(metadata, "author", ""),
+                        "language": metadata.get("language", "") if isinstance(metadata, dict) else getattr(metadata, "language", ""),
+                    }
 
             # Process links if available
-            if hasattr(first_result, 'links') and first_result.links:
-                links = first_result.links
-                if isinstance(links, dict):
-                    processed["links"]["internal"] = links.get("internal", [])
-                    processed["links"]["external"] = links.get("external", [])
-                elif isinstance(links, list):
-                    # Simple list of links, categorize as external
-                    processed["links"]["external"] = [str(link) for link in links]
+            if "links" in include_fields:
+                processed["links"] = {"internal": [], "external": []}
+                links = field('links')
+                if links:
+                    if isinstance(links, dict):
+                        processed["links"]["internal"] = links.get("internal", [])
+                        processed["links"]["external"] = links.get("external", [])
+                    elif isinstance(links, list):
+                        # Simple list of links, categorize as external
+                        processed["links"]["external"] = [str(link) for link in links]
 
             # Process images if available
-            if hasattr(first_result, 'images') and first_result.images:
-                images = first_result.images
-                if isinstance(images, list):
-                    processed["images"] = [
-                        img.dict() if hasattr(img, 'dict') else str(img) for img in images
-                    ]
+            if "images" in include_fields:
+                processed["images"] = []
+                images = field('images')
+                if images and isinstance(images, list):
+                    # Image lists are homogeneous, so pick the converter once
+                    to_item = (lambda img: img.dict()) if hasattr(images[0], 'dict') else str
+                    processed["images"] = [to_item(img) for img in images]
 
             # Process media if available
-            if hasattr(first_result, 'media') and first_result.media:
-                media = first_result.media
-                if isinstance(media, dict):
+            if "media" in include_fields:
+                processed["media"] = {"videos": [], "audios": []}
+                media = field('media')
+                if media and isinstance(media, dict):
                     processed["media"]["videos"] = media.get("videos", [])
                     processed["media"]["audios"] = media.get("audios", [])
 
+            # Heavy fields can be written to files instead of travelling through stdout
+            stream_dir = config.get("stream_dir")
+            if stream_dir:
+                threshold = config.get("stream_threshold", STREAM_THRESHOLD_BYTES)
+                for name in HTML_FIELDS:
+                    value = processed.get(name)
+                    if value and len(value) > threshold:
+                        data = value.encode('utf-8')
+                        processed[f"{name}_path"] = self._write_stream_file(stream_dir, data, '.html')
+                        stream_paths.append(processed[f"{name}_path"])
+                        processed[f"{name}_size"] = len(data)
+                        del processed[name]
+
             # Handle screenshot if present
-            if hasattr(first_result, 'screenshot') and first_result.screenshot:
-                if isinstance(first_result.screenshot, bytes):
-                    processed["screenshot"] = base64.b64encode(first_result.screenshot).decode('utf-8')
+            screenshot = field('screenshot')
+            if screenshot:
+                if stream_dir:
+                    # Raw PNG bytes on disk skip the base64 round-trip entirely
+                    data = screenshot if isinstance(screenshot, bytes) else base64.b64decode(screenshot)
+                    processed["screenshot_path"] = self._write_stream_file(stream_dir, data, '.png')
+                    stream_paths.append(processed["screenshot_path"])
+                    processed["screenshot_size"] = len(data)
+                elif isinstance(screenshot, bytes):
+                    processed["screenshot"] = base64.b64encode(screenshot).decode('ascii')
                 else:
-                    processed["screenshot"] = str(first_result.screenshot)
+                    processed["screenshot"] = str(screenshot)
 
             return processed
 
         except Exception as e:
+            # The caller never learns these paths, so don't leave them behind
+            for path in stream_paths:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
             return {
                 "success": False,
                 "error": f"Failed to process result: {str(e)}",
                 "traceback": traceback.format_exc()
             }
 
+    def _write_stream_file(self, stream_dir: str, data: bytes, suffix: str) -> str:
+        """Write a heavy result field to its own file in stream_dir and return the path"""
+        os.makedirs(stream_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=stream_dir, prefix='crawl4ai_', suffix=suffix)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        return path
+
+
+async def serve():
+    """
+    Persistent mode: read one JSON config per stdin line and answer with one
+    JSON result per stdout line, keeping the browser alive between requests
+    """
+    wrapper = Crawl4AIWrapper()
+    loop = asyncio.get_running_loop()
+
+    try:
+        while True:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                break
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                config = _loads(line)
+                if isinstance(config, list):
+                    config = {"urls": config}
+                result = await wrapper.crawl_persistent(config)
+            except Exception as e:
+                result = {
+                    "success": False,
+                    "error": str(e),
+                    "traceback": traceback.format_exc()
+                }
+
+            _write_result(result)
+    finally:
+        await wrapper.close()
+
+
+def _forked_crawl(config: Dict[str, Any], conn) -> None:
+    """Worker body for --server mode: run one crawl in a forked process and send back the result"""
+    _silence_stdout()
+    try:
+        result = run(Crawl4AIWrapper().crawl(config))
+    except Exception as e:
+        result = {
+            "success": False,
+            "error": str(e),
+            "traceback": traceback.format_exc()
+        }
+    try:
+        conn.send(result)
+    finally:
+        conn.close()
+
+
+def serve_isolated():
+    """
+    Server mode with per-request process isolation: a forkserver parent with
+    crawl4ai preloaded forks one worker per stdin request, so each crawl gets
+    a fresh process without paying interpreter start-up and import cost again
+    """
+    import multiprocessing
+
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        # No forkserver on this platform; fall back to the in-process server
+        run(serve())
+        return
+
+    ctx = multiprocessing.get_context("forkserver")
+    ctx.set_forkserver_preload(["crawl4ai"])
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            config = _loads(line)
+            if isinstance(config, list):
+                config = {"urls": config}
+
+            receiver, sender = ctx.Pipe(duplex=False)
+            worker = ctx.Process(target=_forked_crawl, args=(config, sender))
+            worker.start()
+            sender.close()
+
+            try:
+                result = receiver.recv()
+            except EOFError:
+                worker.join()
+                result = {
+                    "success": False,
+                    "error": f"Crawl worker exited with code {worker.exitcode}"
+                }
+            finally:
+                receiver.close()
+            worker.join()
+
+        except Exception as e:
+            result = {
+                "success": False,
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }
+
+        _write_result(result)
+
+
+def _silence_stdout():
+    """
+    Send stray print() output from crawl4ai/Playwright to os.devnull for the
+    whole process; results are written to sys.__stdout__ by _write_result
+    """
+    sys.stdout = open(os.devnull, 'w')
+
 
 async def main():
     """Main entry point for the wrapper"""
+    _silence_stdout()
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "--serve":
+        await serve()
+        return
+
     try:
         if len(sys.argv) < 2:
             result = {
@@ -348,14 +848,18 @@ async def main():
         else:
             # Parse configuration from command line argument
             config_json = sys.argv[1]
-            config = json.loads(config_json)
+            config = _loads(config_json)
+
+            # A bare list of URLs is shorthand for a batch crawl
+            if isinstance(config, list):
+                config = {"urls": config}
 
             # Create wrapper and execute crawl
             wrapper = Crawl4AIWrapper()
             result = await wrapper.crawl(config)
 
         # Output result as JSON
-        print(json.dumps(result, ensure_ascii=False, indent=None))
+        _write_result(result)
 
     except Exception as e:
         error_result = {
@@ -363,9 +867,28 @@ async def main():
             "error": str(e),
             "traceback": traceback.format_exc()
         }
-        print(json.dumps(error_result, ensure_ascii=False, indent=None))
+        _write_result(error_result)
         sys.exit(1)
 
 
+def run(coro):
+    """Run the entry coroutine, on uvloop's libuv event loop when it is installed"""
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(coro)
+
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            return runner.run(coro)
+
+    uvloop.install()
+    return asyncio.run(coro)
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if len(sys.argv) >= 2 and sys.argv[1] == "--server":
+        _silence_stdout()
+        serve_isolated()
+    else:
+        run(main())
\ No newline at end of file
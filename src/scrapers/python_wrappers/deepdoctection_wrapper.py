@@ -6,16 +6,22 @@ Handles document analysis using the DeepDoctection library
 
 import sys
 import json
+import asyncio
 import traceback
 import base64
-import io
 import tempfile
 import os
+import re
+import shutil
+import mimetypes
 import logging
-from typing import Dict, Any, Optional, List
+import faulthandler
+import importlib.util
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from pathlib import Path
-import requests
+from dataclasses import dataclass
+from urllib.parse import urlparse
 from contextlib import redirect_stdout, redirect_stderr
 
 # Suppress DeepDoctection's verbose output
@@ -33,11 +39,133 @@ os.environ['TRANSFORMERS_VERBOSITY'] = 'error'
 os.environ['USE_TORCH'] = '1'  # Use torch backend
 os.environ['USE_TF'] = '0'  # Disable TensorFlow
 
+# Shared sink for library chatter suppressed around model calls; unlike an
+# in-memory buffer it never accumulates the discarded output
+_DEVNULL = open(os.devnull, 'w')
+
+# DeepDoctection pulls in torch/transformers, so it is only imported on first
+# use; availability is decided from the module spec without loading it
+DEEPDOCTECTION_AVAILABLE = importlib.util.find_spec('deepdoctection') is not None
+IMPORT_ERROR = None if DEEPDOCTECTION_AVAILABLE else "No module named 'deepdoctection'"
+ADVANCED_FEATURES = False
+dd = None
+DataFromList = None
+
+# OCR libraries
+EASYOCR_AVAILABLE = importlib.util.find_spec('easyocr') is not None
+LAYOUTPARSER_AVAILABLE = importlib.util.find_spec('layoutparser') is not None
+
+# Document extension at the end of a URL path or file name, and the format it implies
+_EXT_RE = re.compile(r'\.(pdf|png|jpe?g|tiff?)(?:$|[?#])', re.IGNORECASE)
+EXTENSION_FORMATS = {
+    'pdf': 'pdf',
+    'png': 'image',
+    'jpg': 'image',
+    'jpeg': 'image',
+    'tif': 'tiff',
+    'tiff': 'tiff',
+}
+
+# Vectorized table post-processing when numpy is available
 try:
-    import deepdoctection as dd
-    from deepdoctection.dataflow import DataFromList
-    from deepdoctection.analyzer import get_dd_analyzer
-    DEEPDOCTECTION_AVAILABLE = True
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Fast JSON serialization when available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# C-backed HTML parsers for the fallback text extraction (stdlib parser otherwise)
+try:
+    from selectolax.parser import HTMLParser as FastHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Concurrent batch downloads use aiohttp when installed
+AIOHTTP_AVAILABLE = importlib.util.find_spec('aiohttp') is not None
+
+# Chunk size used when streaming downloads to disk
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Bytes of an HTML page read when building the fallback text preview
+FALLBACK_READ_BYTES = 64 * 1024
+
+# Extensions for the document types the wrapper knows how to analyze
+CONTENT_TYPE_EXTENSIONS = {
+    'application/pdf': '.pdf',
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/tiff': '.tiff',
+}
+
+# Catch-all types servers (e.g. S3) send for any file; they say nothing about the format
+GENERIC_CONTENT_TYPES = frozenset({
+    'application/octet-stream',
+    'binary/octet-stream',
+    'application/download',
+    'application/force-download',
+    'application/x-download',
+})
+
+
+def _loads(data: str) -> Any:
+    """Parse a JSON config"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(result: Dict[str, Any]) -> str:
+    """Serialize a result as a single JSON line"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(result, ensure_ascii=False, indent=None)
+
+
+def _write_result(result: Dict[str, Any]) -> None:
+    """Write one result as a single JSON line on the real stdout"""
+    out = sys.__stdout__
+    out.write(_dumps(result) + '\n')
+    out.flush()
+
+
+def _silence_stdout() -> None:
+    """
+    Send stray print() output from DeepDoctection to os.devnull for the whole
+    process; results are written to sys.__stdout__ by _write_result
+    """
+    sys.stdout = _DEVNULL
+
+
+def _load_deepdoctection() -> bool:
+    """Import DeepDoctection on first use, returning whether it is usable"""
+    global dd, DataFromList, DEEPDOCTECTION_AVAILABLE, IMPORT_ERROR, ADVANCED_FEATURES
+    if dd is not None or not DEEPDOCTECTION_AVAILABLE:
+        return DEEPDOCTECTION_AVAILABLE
+
+    try:
+        with redirect_stdout(_DEVNULL), redirect_stderr(_DEVNULL):
+            import deepdoctection
+            from deepdoctection.dataflow import DataFromList as data_from_list
+    except ImportError as e:
+        DEEPDOCTECTION_AVAILABLE = False
+        IMPORT_ERROR = str(e)
+        return False
 
     # Try to import optional components
     try:
@@ -47,42 +175,188 @@ try:
     except ImportError:
         ADVANCED_FEATURES = False
 
-except ImportError as e:
-    DEEPDOCTECTION_AVAILABLE = False
-    IMPORT_ERROR = str(e)
-    ADVANCED_FEATURES = False
+    dd, DataFromList = deepdoctection, data_from_list
+    return True
 
-# Try to import OCR libraries
-try:
-    import easyocr
-    EASYOCR_AVAILABLE = True
-except ImportError:
-    EASYOCR_AVAILABLE = False
 
-try:
-    import layoutparser as lp
-    LAYOUTPARSER_AVAILABLE = True
-except ImportError:
-    LAYOUTPARSER_AVAILABLE = False
+def _ext(url: str) -> str:
+    """Lower-cased document extension of a URL or path, or '' when unrecognized"""
+    match = _EXT_RE.search(url)
+    return match.group(1).lower() if match else ''
+
+
+def _extension_for(content_type_header: str, url: str) -> str:
+    """
+    Temp file extension for a download: a known document content type, then
+    the URL path suffix, then whatever else the content type maps to
+    """
+    content_type = content_type_header.split(';')[0].strip().lower()
+    extension = CONTENT_TYPE_EXTENSIONS.get(content_type) or os.path.splitext(urlparse(url).path)[1]
+    if not extension and content_type not in GENERIC_CONTENT_TYPES:
+        extension = mimetypes.guess_extension(content_type)
+    return extension or '.pdf'
+
+
+def _create_session() -> Any:
+    """requests Session keeping pooled keep-alive connections for reuse across downloads"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+async def _download_one(session: Any, url: str) -> Tuple[str, bool]:
+    """Stream one URL into a temporary file, returning (path, is_temp)"""
+    if not url.startswith('http'):
+        return url, False
+
+    async with session.get(url) as response:
+        response.raise_for_status()
+        ext = _extension_for(response.headers.get('content-type', ''), url)
+        with tempfile.NamedTemporaryFile(delete=False, suffix=ext, dir=tempfile.gettempdir()) as tmp:
+            try:
+                async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    tmp.write(chunk)
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+            return tmp.name, True
+
+
+async def _download_many(urls: List[str]) -> List[Any]:
+    """
+    Download documents concurrently over one aiohttp session, returning
+    (path, is_temp) or the raised exception for each URL, in order
+    """
+    import aiohttp
+
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=30)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        return await asyncio.gather(*[_download_one(session, url) for url in urls], return_exceptions=True)
+
+
+def _sort_cells(cells: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Put extracted table cells in row-major order"""
+    if len(cells) < 2:
+        return cells
+
+    # Cells without an index (e.g. spanning headers) sort first, as index 0
+    rows = [cell["row"] or 0 for cell in cells]
+    cols = [cell["col"] or 0 for cell in cells]
+    if NUMPY_AVAILABLE:
+        order = np.lexsort((np.asarray(cols, dtype=np.int64), np.asarray(rows, dtype=np.int64))).tolist()
+    else:
+        order = sorted(range(len(cells)), key=lambda i: (rows[i], cols[i]))
+    return [cells[i] for i in order]
+
+
+def _html_to_text(html: str) -> str:
+    """Extract whitespace-normalized visible text from an HTML document"""
+    if SELECTOLAX_AVAILABLE:
+        tree = FastHTMLParser(html)
+        node = tree.body or tree.root
+        return node.text(separator=' ', strip=True) if node is not None else ''
+
+    if LXML_AVAILABLE:
+        try:
+            return ' '.join(lxml.html.fromstring(html).text_content().split())
+        except Exception:
+            pass
+
+    # Simple HTML text extraction
+    from html.parser import HTMLParser
+
+    class TextExtractor(HTMLParser):
+        def __init__(self):
+            super().__init__()
+            self.text = []
+
+        def handle_data(self, data):
+            data = data.strip()
+            if data:
+                self.text.append(data)
+
+    parser = TextExtractor()
+    parser.feed(html)
+    return ' '.join(parser.text)
+
+
+def _compile_torch_module(module: Any) -> Any:
+    """
+    Wrap a torch nn.Module with torch.compile, returning it unchanged when
+    torch/torch.compile is unavailable or the object isn't a module
+    """
+    try:
+        import torch
+    except ImportError:
+        return module
+
+    if not hasattr(torch, 'compile') or not isinstance(module, torch.nn.Module):
+        return module
+
+    try:
+        return torch.compile(module, mode="reduce-overhead", fullgraph=False)
+    except Exception as e:
+        # Keep this module eager rather than failing the analyzer
+        logging.warning("torch.compile failed for %s, using eager mode: %s", type(module).__name__, e)
+        return module
+
+
+@dataclass
+class PageInfo:
+    """Information extracted from one analyzed page, converted to a dict only for output"""
+    __slots__ = ('page_number', 'text', 'tables', 'figures', 'layout_elements', 'error')
+
+    page_number: int
+    text: str
+    tables: List[Dict[str, Any]]
+    figures: List[Dict[str, Any]]
+    layout_elements: List[Dict[str, Any]]
+    error: Optional[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready representation, omitting error when extraction succeeded"""
+        result = {
+            "page_number": self.page_number,
+            "text": self.text,
+            "tables": self.tables,
+            "figures": self.figures,
+            "layout_elements": self.layout_elements
+        }
+        if self.error is not None:
+            result["error"] = self.error
+        return result
 
 
 class DeepDoctectionWrapper:
     """Wrapper for DeepDoctection document analysis functionality"""
 
-    def __init__(self):
-        self.analyzer = None
+    def __init__(self, compile_models: bool = False):
+        # Analyzers keyed by the options that shape their pipeline, reused across documents
+        self.analyzers: Dict[tuple, Any] = {}
+        # torch.compile only pays off when the analyzer outlives one document
+        self.compile_models = compile_models
+        # HTTP session shared by every download so connections are kept alive
+        self.session = None
 
-    def process_document(self, config: Dict[str, Any]) -> Dict[str, Any]:
+    def process_document(self, config: Dict[str, Any],
+                         download: Optional[Tuple[str, bool]] = None) -> Dict[str, Any]:
         """
         Process document with DeepDoctection
 
         Args:
             config: Processing configuration containing document URL, options, etc.
+            download: Already downloaded (path, is_temp) for the document, if any
 
         Returns:
             Dictionary with analysis results
         """
-        if not DEEPDOCTECTION_AVAILABLE:
+        if not _load_deepdoctection():
             return self._get_fallback_result(config)
 
         try:
@@ -97,28 +371,29 @@ class DeepDoctectionWrapper:
                 }
 
             # Download document if it's a URL
-            document_path = self._download_document(document_url)
+            document_path, is_temp = download or self._download_document(document_url)
 
-            # Try to create analyzer with specified configuration
             try:
-                analyzer = self._create_analyzer(options)
-            except (ModuleNotFoundError, ImportError) as e:
-                # If analyzer creation fails due to missing dependencies, use fallback
-                return self._get_fallback_result(config)
-
-            # Process the document
-            df = DataFromList([document_path])
-
-            # Analyze document with output suppressed
-            analysis_results = []
-            with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
-                for page_num, page in enumerate(analyzer.analyze(dataset_dataflow=df)):
-                    page_result = self._extract_page_info(page, page_num + 1, options)
-                    analysis_results.append(page_result)
-
-            # Clean up temporary file
-            if document_path.startswith('/tmp/'):
-                os.unlink(document_path)
+                # Try to create analyzer with specified configuration
+                try:
+                    analyzer = self._create_analyzer(options)
+                except (ModuleNotFoundError, ImportError) as e:
+                    # If analyzer creation fails due to missing dependencies, use fallback
+                    return self._get_fallback_result(config)
+
+                # Process the document
+                df = DataFromList([document_path])
+
+                # Analyze document with output suppressed
+                analysis_results = []
+                with redirect_stdout(_DEVNULL), redirect_stderr(_DEVNULL):
+                    for page_num, page in enumerate(analyzer.analyze(dataset_dataflow=df)):
+                        page_result = self._extract_page_info(page, page_num + 1, options)
+                        analysis_results.append(page_result)
+            finally:
+                # Only remove files we downloaded, never a caller's local path
+                if is_temp:
+                    os.unlink(document_path)
 
             # Build final result
             return self._build_result(analysis_results, document_url, options)
@@ -130,6 +405,37 @@ class DeepDoctectionWrapper:
                 "traceback": traceback.format_exc()
             }
 
+    def process_documents(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process a batch of documents, downloading all of them concurrently first
+
+        Args:
+            config: Configuration with a "urls" list and "options" shared by every document
+
+        Returns:
+            Dictionary with one process_document result per URL, in order
+        """
+        urls = config.get("urls") or []
+        options = config.get("options", {})
+
+        if AIOHTTP_AVAILABLE and _load_deepdoctection():
+            downloads = asyncio.run(_download_many(urls))
+        else:
+            # Each document downloads on its own (the fallback path never needs the file)
+            downloads = [None] * len(urls)
+
+        results = []
+        for url, download in zip(urls, downloads):
+            if isinstance(download, Exception):
+                results.append({
+                    "success": False,
+                    "error": f"DeepDoctection processing failed: {str(download)}"
+                })
+            else:
+                results.append(self.process_document({"document_url": url, "options": options}, download))
+
+        return {"success": True, "results": results}
+
     def _get_fallback_result(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Return a basic result when DeepDoctection is not available"""
         document_url = config.get("document_url", "unknown")
@@ -137,24 +443,15 @@ class DeepDoctectionWrapper:
         # Try basic text extraction with requests
         try:
             if document_url.startswith('http'):
-                response = requests.get(document_url, timeout=10)
-                content_type = response.headers.get('content-type', '')
+                # Only the first 1000 characters are returned, so read a bounded prefix
+                with self._get_session().get(document_url, stream=True, timeout=10) as response:
+                    content_type = response.headers.get('content-type', '')
+                    prefix = b''
+                    if 'text/html' in content_type:
+                        prefix = next(response.iter_content(FALLBACK_READ_BYTES), b'')
 
                 if 'text/html' in content_type:
-                    # Simple HTML text extraction
-                    from html.parser import HTMLParser
-
-                    class TextExtractor(HTMLParser):
-                        def __init__(self):
-                            super().__init__()
-                            self.text = []
-
-                        def handle_data(self, data):
-                            self.text.append(data.strip())
-
-                    parser = TextExtractor()
-                    parser.feed(response.text)
-                    text = ' '.join([t for t in parser.text if t])
+                    text = _html_to_text(prefix.decode(response.encoding or 'utf-8', errors='ignore'))
 
                     return {
                         "success": True,
@@ -192,41 +489,50 @@ class DeepDoctectionWrapper:
             "error": f"DeepDoctection not available: {IMPORT_ERROR if not DEEPDOCTECTION_AVAILABLE else 'Unknown'}"
         }
 
-    def _download_document(self, url: str) -> str:
-        """Download document from URL and save to temporary file"""
+    def _get_session(self) -> Any:
+        """Return the shared HTTP session, creating it on first download"""
+        if self.session is None:
+            self.session = _create_session()
+        return self.session
+
+    def _download_document(self, url: str) -> Tuple[str, bool]:
+        """Download document from URL and save to temporary file, returning (path, is_temp)"""
         if not url.startswith('http'):
             # Assume it's already a local file path
-            return url
+            return url, False
 
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+        # Stream to a temporary file so large documents are never held in memory
+        with self._get_session().get(url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+
+            ext = _extension_for(response.headers.get('content-type', ''), url)
 
-        # Determine file extension from URL or content type
-        ext = '.pdf'  # Default
-        if '.pdf' in url.lower():
-            ext = '.pdf'
-        elif '.png' in url.lower():
-            ext = '.png'
-        elif '.jpg' in url.lower() or '.jpeg' in url.lower():
-            ext = '.jpg'
-        elif '.tiff' in url.lower() or '.tif' in url.lower():
-            ext = '.tiff'
-
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
-            tmp.write(response.content)
-            return tmp.name
+            # Let urllib3 undo any gzip/deflate transfer encoding on the raw stream
+            response.raw.decode_content = True
+            with tempfile.NamedTemporaryFile(delete=False, suffix=ext, dir=tempfile.gettempdir()) as tmp:
+                try:
+                    shutil.copyfileobj(response.raw, tmp, length=DOWNLOAD_CHUNK_SIZE)
+                except BaseException:
+                    tmp.close()
+                    os.unlink(tmp.name)
+                    raise
+                return tmp.name, True
 
     def _create_analyzer(self, options: Dict[str, Any]) -> Any:
-        """Create DeepDoctection analyzer with specified options"""
+        """Return a DeepDoctection analyzer for the specified options, creating it on first use"""
         # Get configuration
         analyzer_type = options.get("analyzer_type", "auto")
         ocr_enabled = options.get("ocr", False)  # Disable OCR by default due to compatibility
         table_detection = options.get("table_detection", True)
         layout_detection = options.get("layout_detection", True)
 
+        key = (layout_detection, table_detection)
+        analyzer = self.analyzers.get(key)
+        if analyzer is not None:
+            return analyzer
+
         # Suppress output during analyzer creation
-        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+        with redirect_stdout(_DEVNULL), redirect_stderr(_DEVNULL):
             try:
                 # Try to create analyzer with custom config
                 config_overwrite = {
@@ -239,95 +545,102 @@ class DeepDoctectionWrapper:
                 # Create analyzer without OCR to avoid compatibility issues
                 analyzer = dd.get_dd_analyzer(config_overwrite=config_overwrite)
             except Exception as e:
-                # Fallback to minimal analyzer
-                try:
-                    analyzer = dd.get_dd_analyzer(config_overwrite={"USE_OCR": False})
-                except:
-                    # Last resort - return None and handle in caller
-                    return None
+                # Fallback to minimal analyzer; if that fails too its error reaches the caller
+                analyzer = dd.get_dd_analyzer(config_overwrite={"USE_OCR": False})
 
+        if self.compile_models:
+            self._compile_analyzer(analyzer)
+
+        self.analyzers[key] = analyzer
         return analyzer
 
-    def _extract_page_info(self, page: Any, page_num: int, options: Dict[str, Any]) -> Dict[str, Any]:
+    def _compile_analyzer(self, analyzer: Any):
+        """Graph-compile the torch models behind each pipeline component's predictor"""
+        for component in getattr(analyzer, 'pipe_component_list', []):
+            predictor = getattr(component, 'predictor', None)
+            model = getattr(predictor, 'model', None)
+            if model is None:
+                logging.warning("%s has no predictor.model to compile", type(component).__name__)
+                continue
+            predictor.model = _compile_torch_module(model)
+
+    def _extract_page_info(self, page: Any, page_num: int, options: Dict[str, Any]) -> PageInfo:
         """Extract information from a single page"""
-        page_info = {
-            "page_number": page_num,
-            "text": "",
-            "tables": [],
-            "figures": [],
-            "layout_elements": []
-        }
+        page_info = PageInfo(page_num, "", [], [], [], None)
 
         try:
             # Extract text
-            if hasattr(page, 'text'):
-                page_info["text"] = str(page.text)
+            page_info.text = str(getattr(page, 'text', ''))
 
             # Extract tables
-            if hasattr(page, 'tables'):
-                for table in page.tables:
-                    table_data = {
-                        "rows": [],
-                        "columns": getattr(table, 'column_count', 0),
-                        "bbox": getattr(table, 'bbox', None)
-                    }
-                    if hasattr(table, 'cells'):
-                        for cell in table.cells:
-                            table_data["rows"].append({
-                                "text": getattr(cell, 'text', ''),
-                                "row": getattr(cell, 'row_idx', 0),
-                                "col": getattr(cell, 'col_idx', 0)
-                            })
-                    page_info["tables"].append(table_data)
+            append_table = page_info.tables.append
+            for table in getattr(page, 'tables', ()):
+                rows = []
+                append_row = rows.append
+                for cell in getattr(table, 'cells', ()):
+                    try:
+                        append_row({"text": cell.text, "row": cell.row_idx, "col": cell.col_idx})
+                    except AttributeError:
+                        append_row({
+                            "text": getattr(cell, 'text', ''),
+                            "row": getattr(cell, 'row_idx', 0),
+                            "col": getattr(cell, 'col_idx', 0)
+                        })
+                append_table({
+                    "rows": _sort_cells(rows),
+                    "columns": getattr(table, 'column_count', 0),
+                    "bbox": getattr(table, 'bbox', None)
+                })
 
             # Extract figures/images
-            if hasattr(page, 'images'):
-                for img in page.images:
-                    page_info["figures"].append({
-                        "caption": getattr(img, 'caption', ''),
-                        "bbox": getattr(img, 'bbox', None)
-                    })
+            page_info.figures = [
+                {"caption": getattr(img, 'caption', ''), "bbox": getattr(img, 'bbox', None)}
+                for img in getattr(page, 'images', ())
+            ]
 
             # Extract layout elements
-            if hasattr(page, 'layouts'):
-                for layout in page.layouts:
-                    page_info["layout_elements"].append({
-                        "type": getattr(layout, 'category_name', 'unknown'),
-                        "text": getattr(layout, 'text', ''),
-                        "bbox": getattr(layout, 'bbox', None)
-                    })
+            page_info.layout_elements = [
+                {
+                    "type": getattr(layout, 'category_name', 'unknown'),
+                    "text": getattr(layout, 'text', ''),
+                    "bbox": getattr(layout, 'bbox', None)
+                }
+                for layout in getattr(page, 'layouts', ())
+            ]
 
         except Exception as e:
-            page_info["error"] = str(e)
+            page_info.error = str(e)
 
         return page_info
 
-    def _build_result(self, analysis_results: List[Dict[str, Any]],
+    def _build_result(self, analysis_results: List[PageInfo],
                      document_url: str, options: Dict[str, Any]) -> Dict[str, Any]:
         """Build final result from analysis"""
         # Combine text from all pages
         full_text = "\n\n".join([
-            page.get("text", "") for page in analysis_results
+            page.text for page in analysis_results
         ])
 
         # Collect all tables and figures
         all_tables = []
         all_figures = []
         for page in analysis_results:
-            all_tables.extend(page.get("tables", []))
-            all_figures.extend(page.get("figures", []))
+            all_tables.extend(page.tables)
+            all_figures.extend(page.figures)
+
+        document = {
+            "text": full_text,
+            "pages": len(analysis_results),
+            "format": self._detect_format(document_url)
+        }
 
-        # Build markdown representation
-        markdown = self._build_markdown(analysis_results)
+        # Build markdown representation only when the caller asks for it
+        if options.get("markdown", False):
+            document["markdown"] = self._build_markdown(analysis_results)
 
         return {
             "success": True,
-            "document": {
-                "text": full_text,
-                "markdown": markdown,
-                "pages": len(analysis_results),
-                "format": self._detect_format(document_url)
-            },
+            "document": document,
             "metadata": {
                 "title": self._extract_title(analysis_results),
                 "page_count": len(analysis_results),
@@ -337,30 +650,30 @@ class DeepDoctectionWrapper:
             },
             "tables": all_tables,
             "figures": all_figures,
-            "pages": analysis_results
+            "pages": [page.to_dict() for page in analysis_results]
         }
 
-    def _build_markdown(self, analysis_results: List[Dict[str, Any]]) -> str:
+    def _build_markdown(self, analysis_results: List[PageInfo]) -> str:
         """Build markdown representation of the document"""
         markdown_parts = []
 
         for page in analysis_results:
-            page_num = page.get("page_number", 0)
+            page_num = page.page_number
             markdown_parts.append(f"## Page {page_num}\n")
 
             # Add text
-            if page.get("text"):
-                markdown_parts.append(page["text"] + "\n")
+            if page.text:
+                markdown_parts.append(page.text + "\n")
 
             # Add table references
-            tables = page.get("tables", [])
+            tables = page.tables
             if tables:
                 markdown_parts.append(f"\n### Tables (Page {page_num})")
                 for i, table in enumerate(tables):
                     markdown_parts.append(f"- Table {i+1}: {table.get('columns', 0)} columns")
 
             # Add figure references
-            figures = page.get("figures", [])
+            figures = page.figures
             if figures:
                 markdown_parts.append(f"\n### Figures (Page {page_num})")
                 for i, fig in enumerate(figures):
@@ -371,28 +684,21 @@ class DeepDoctectionWrapper:
 
     def _detect_format(self, url: str) -> str:
         """Detect document format from URL"""
-        url_lower = url.lower()
-        if '.pdf' in url_lower:
-            return 'pdf'
-        elif '.png' in url_lower or '.jpg' in url_lower or '.jpeg' in url_lower:
-            return 'image'
-        elif '.tiff' in url_lower or '.tif' in url_lower:
-            return 'tiff'
-        return 'unknown'
-
-    def _extract_title(self, analysis_results: List[Dict[str, Any]]) -> str:
+        return EXTENSION_FORMATS.get(_ext(url), 'unknown')
+
+    def _extract_title(self, analysis_results: List[PageInfo]) -> str:
         """Try to extract title from document"""
         if not analysis_results:
             return "Untitled Document"
 
         # Look for title in first page's layout elements
         first_page = analysis_results[0]
-        for element in first_page.get("layout_elements", []):
+        for element in first_page.layout_elements:
             if element.get("type") == "title":
                 return element.get("text", "Untitled Document")
 
         # Use first text line as fallback
-        text = first_page.get("text", "")
+        text = first_page.text
         if text:
             lines = text.split('\n')
             if lines:
@@ -401,8 +707,44 @@ class DeepDoctectionWrapper:
         return "Untitled Document"
 
 
+def serve():
+    """
+    Persistent mode: read one JSON config per stdin line and answer with one
+    JSON result per stdout line, keeping loaded models resident between documents
+    """
+    faulthandler.enable()
+    wrapper = DeepDoctectionWrapper(compile_models=True)
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            config = _loads(line)
+            if "urls" in config:
+                result = wrapper.process_documents(config)
+            else:
+                result = wrapper.process_document(config)
+        except Exception as e:
+            # One bad document must not take the worker down
+            result = {
+                "success": False,
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }
+
+        _write_result(result)
+
+
 def main():
     """Main entry point for the wrapper"""
+    _silence_stdout()
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "--serve":
+        serve()
+        return
+
     try:
         if len(sys.argv) < 2:
             result = {
@@ -412,14 +754,17 @@ def main():
         else:
             # Parse configuration from command line argument
             config_json = sys.argv[1]
-            config = json.loads(config_json)
+            config = _loads(config_json)
 
-            # Create wrapper and process document
+            # Create wrapper and process document(s)
             wrapper = DeepDoctectionWrapper()
-            result = wrapper.process_document(config)
+            if "urls" in config:
+                result = wrapper.process_documents(config)
+            else:
+                result = wrapper.process_document(config)
 
         # Output result as JSON
-        print(json.dumps(result, ensure_ascii=False, indent=None))
+        _write_result(result)
 
     except Exception as e:
         error_result = {
@@ -427,7 +772,7 @@ def main():
             "error": str(e),
             "traceback": traceback.format_exc()
         }
-        print(json.dumps(error_result, ensure_ascii=False, indent=None))
+        _write_result(error_result)
         sys.exit(1)
 
 
@@ -6,106 +6,304 @@ Uses available ML libraries for document analysis
 
 import sys
 import json
+import asyncio
 import traceback
 import base64
 import io
 import tempfile
 import os
+import re
+import shutil
+import mimetypes
 import logging
-from typing import Dict, Any, Optional, List
+import faulthandler
+import importlib
+import importlib.util
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from pathlib import Path
-import requests
+from urllib.parse import urlparse
 from contextlib import redirect_stdout, redirect_stderr
 
 # Suppress verbose output
 logging.basicConfig(level=logging.ERROR)
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 
-# Check available libraries
+# Shared sink for library chatter suppressed around model calls; unlike an
+# in-memory buffer it never accumulates the discarded output
+_DEVNULL = open(os.devnull, 'w')
+
+# Check available libraries without importing them; the heavy ones
+# (torch, transformers) are only loaded by the code path that needs them
 LIBRARIES_STATUS = {
-    'deepdoctection': False,
-    'layoutparser': False,
-    'easyocr': False,
-    'pypdf': False,
-    'pdfplumber': False
+    name: importlib.util.find_spec(name) is not None
+    for name in ('deepdoctection', 'layoutparser', 'easyocr', 'pypdf', 'pdfplumber')
 }
 
-# Try importing libraries
-try:
-    import layoutparser as lp
-    LIBRARIES_STATUS['layoutparser'] = True
-except ImportError:
-    pass
+# Modules imported so far, keyed by module name
+_MODULES: Dict[str, Any] = {}
+
+# Document extension at the end of a URL path or file name, and the format it implies
+_EXT_RE = re.compile(r'\.(pdf|png|jpe?g|tiff?)(?:$|[?#])', re.IGNORECASE)
+EXTENSION_FORMATS = {
+    'pdf': 'pdf',
+    'png': 'image',
+    'jpg': 'image',
+    'jpeg': 'image',
+    'tif': 'tiff',
+    'tiff': 'tiff',
+}
 
+# Fast JSON serialization when available
 try:
-    import easyocr
-    LIBRARIES_STATUS['easyocr'] = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    pass
+    ORJSON_AVAILABLE = False
 
-try:
-    import pypdf
-    LIBRARIES_STATUS['pypdf'] = True
-except ImportError:
-    pass
+# Concurrent batch downloads use aiohttp when installed
+AIOHTTP_AVAILABLE = importlib.util.find_spec('aiohttp') is not None
 
-try:
-    import pdfplumber
-    LIBRARIES_STATUS['pdfplumber'] = True
-except ImportError:
-    pass
+# Chunk size used when streaming downloads to disk
+DOWNLOAD_CHUNK_SIZE = 1 << 20
 
-# Try importing deepdoctection with fallback
-try:
-    # Suppress warnings during import
-    import warnings
-    warnings.filterwarnings('ignore')
+# Images per EasyOCR batch, and the square size batched images are resized to
+OCR_BATCH_SIZE = 8
+OCR_BATCH_SIZE_PX = 640
+
+# Extensions for the document types the wrapper knows how to analyze
+CONTENT_TYPE_EXTENSIONS = {
+    'application/pdf': '.pdf',
+    'image/png': '.png',
+    'image/jpeg': '.jpg',
+    'image/tiff': '.tiff',
+}
+
+# Catch-all types servers (e.g. S3) send for any file; they say nothing about the format
+GENERIC_CONTENT_TYPES = frozenset({
+    'application/octet-stream',
+    'binary/octet-stream',
+    'application/download',
+    'application/force-download',
+    'application/x-download',
+})
+
+# Suppress library warnings
+import warnings
+warnings.filterwarnings('ignore')
+
+
+def _load(name: str) -> Any:
+    """
+    Import a library on first use and cache it, returning None (and marking
+    it unavailable) when it fails to load
+    """
+    module = _MODULES.get(name)
+    if module is not None or not LIBRARIES_STATUS.get(name, True):
+        return module
+
+    try:
+        with redirect_stdout(_DEVNULL), redirect_stderr(_DEVNULL):
+            module = importlib.import_module(name)
+    except Exception:
+        LIBRARIES_STATUS[name] = False
+        return None
+
+    _MODULES[name] = module
+    return module
+
+
+def _ext(url: str) -> str:
+    """Lower-cased document extension of a URL or path, or '' when unrecognized"""
+    match = _EXT_RE.search(url)
+    return match.group(1).lower() if match else ''
+
+
+def _extension_for(content_type_header: str, url: str) -> str:
+    """
+    Temp file extension for a download: a known document content type, then
+    the URL path suffix, then whatever else the content type maps to
+    """
+    content_type = content_type_header.split(';')[0].strip().lower()
+    extension = CONTENT_TYPE_EXTENSIONS.get(content_type) or os.path.splitext(urlparse(url).path)[1]
+    if not extension and content_type not in GENERIC_CONTENT_TYPES:
+        extension = mimetypes.guess_extension(content_type)
+    return extension or '.pdf'
+
+
+def _create_session() -> Any:
+    """requests Session keeping pooled keep-alive connections for reuse across downloads"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+async def _download_one(session: Any, url: str) -> Tuple[str, bool]:
+    """Stream one URL into a temporary file, returning (path, is_temp)"""
+    if not url.startswith('http'):
+        return url, False
 
-    with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
-        import deepdoctection as dd
-        LIBRARIES_STATUS['deepdoctection'] = True
-except Exception:
-    pass
+    async with session.get(url) as response:
+        response.raise_for_status()
+        ext = _extension_for(response.headers.get('content-type', ''), url)
+        with tempfile.NamedTemporaryFile(delete=False, suffix=ext, dir=tempfile.gettempdir()) as tmp:
+            try:
+                async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                    tmp.write(chunk)
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+            return tmp.name, True
+
+
+async def _download_many(urls: List[str]) -> List[Any]:
+    """
+    Download documents concurrently over one aiohttp session, returning
+    (path, is_temp) or the raised exception for each URL, in order
+    """
+    import aiohttp
+
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=30)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        return await asyncio.gather(*[_download_one(session, url) for url in urls], return_exceptions=True)
+
+
+def _loads(data: str) -> Any:
+    """Parse a JSON config"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(result: Dict[str, Any]) -> str:
+    """Serialize a result as a single JSON line"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            pass
+    return json.dumps(result, ensure_ascii=False, indent=None)
+
+
+def _write_result(result: Dict[str, Any]) -> None:
+    """Write one result as a single JSON line on the real stdout"""
+    out = sys.__stdout__
+    out.write(_dumps(result) + '\n')
+    out.flush()
+
+
+def _silence_stdout() -> None:
+    """
+    Send stray print() output from the OCR and layout libraries to os.devnull
+    for the whole process; results are written to sys.__stdout__ by _write_result
+    """
+    sys.stdout = _DEVNULL
+
+
+def _cuda_available() -> bool:
+    """Whether torch can run models on a CUDA device"""
+    try:
+        import torch
+        return torch.cuda.is_available()
+    except ImportError:
+        return False
+
+
+def _compile_torch_module(module: Any) -> Any:
+    """
+    Wrap a torch nn.Module with torch.compile, returning it unchanged when
+    torch/torch.compile is unavailable or the object isn't a module
+    """
+    try:
+        import torch
+    except ImportError:
+        return module
+
+    if not hasattr(torch, 'compile') or not isinstance(module, torch.nn.Module):
+        return module
+
+    # Fall back to eager execution instead of failing a document on a compile error
+    torch._dynamo.config.suppress_errors = True
+    return torch.compile(module, mode="reduce-overhead", fullgraph=False)
 
 
 class DocumentAnalyzer:
     """Unified document analyzer using available libraries"""
 
-    def __init__(self):
+    def __init__(self, compile_models: bool = False):
         self.ocr_reader = None
         self.layout_model = None
-        self._initialize_tools()
+        # torch.compile only pays off when the models outlive one document
+        self.compile_models = compile_models
+        # OCR/layout models are only needed for images, so they load on first use
+        self.tools_initialized = False
+        # HTTP session shared by every download so connections are kept alive
+        self.session = None
+        # PDF libraries are light, so they are bound once here rather than looked up per document
+        self.pdfplumber = _load('pdfplumber')
+        self.pypdf = _load('pypdf')
 
     def _initialize_tools(self):
         """Initialize available tools"""
+        if self.tools_initialized:
+            return
+        self.tools_initialized = True
+
         # Initialize EasyOCR if available
-        if LIBRARIES_STATUS['easyocr']:
+        easyocr = _load('easyocr')
+        if easyocr is not None:
             try:
-                self.ocr_reader = easyocr.Reader(['en'], gpu=False, verbose=False)
-            except:
-                pass
+                # quantize only affects CPU inference, where it switches the models to int8
+                self.ocr_reader = easyocr.Reader(['en'], gpu=_cuda_available(), quantize=True, verbose=False)
+            except Exception as e:
+                logging.error("EasyOCR initialization failed: %s", e)
 
         # Initialize LayoutParser if available
-        if LIBRARIES_STATUS['layoutparser']:
+        lp = _load('layoutparser')
+        if lp is not None:
             try:
                 # Use a lightweight model
                 self.layout_model = lp.AutoLayoutModel('lp://PubLayNet/faster_rcnn_R_50_FPN_3x/config')
-            except:
-                pass
+                if self.compile_models:
+                    self._compile_layout_model()
+            except Exception as e:
+                logging.error("LayoutParser initialization failed: %s", e)
+
+    def _compile_layout_model(self):
+        """Graph-compile the torch module behind the LayoutParser model"""
+        predictor = getattr(self.layout_model, 'model', None)
+        if predictor is None:
+            return
+
+        # Detectron2 models wrap the nn.Module in a predictor object
+        inner = getattr(predictor, 'model', None)
+        if inner is not None:
+            predictor.model = _compile_torch_module(inner)
+        else:
+            self.layout_model.model = _compile_torch_module(predictor)
 
-    def analyze_document(self, config: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_document(self, config: Dict[str, Any],
+                         download: Optional[Tuple[str, bool]] = None) -> Dict[str, Any]:
         """
         Analyze document using available tools
 
         Args:
             config: Processing configuration
+            download: Already downloaded (path, is_temp) for the document, if any
 
         Returns:
             Dictionary with analysis results
         """
-        document_url = config.get("document_url")
         options = config.get("options", {})
+        # A batch of local images can be OCR'd in one call through options.paths
+        paths = options.get("paths")
+        document_url = config.get("document_url") or (paths[0] if isinstance(paths, list) and paths else None)
 
         if not document_url:
             return {
@@ -115,22 +313,23 @@ class DocumentAnalyzer:
 
         try:
             # Download document
-            document_path = self._download_document(document_url)
-
-            # Determine document type
-            doc_type = self._get_document_type(document_path)
-
-            # Process based on type and available libraries
-            if doc_type == 'pdf':
-                result = self._process_pdf(document_path, options)
-            elif doc_type in ['png', 'jpg', 'jpeg']:
-                result = self._process_image(document_path, options)
-            else:
-                result = self._process_generic(document_path, options)
+            document_path, is_temp = download or self._download_document(document_url)
 
-            # Clean up
-            if document_path.startswith('/tmp/'):
-                os.unlink(document_path)
+            try:
+                # Determine document type
+                doc_type = self._get_document_type(document_path)
+
+                # Process based on type and available libraries
+                if doc_type == 'pdf':
+                    result = self._process_pdf(document_path, options)
+                elif doc_type == 'image':
+                    result = self._process_image(document_path, options)
+                else:
+                    result = self._process_generic(document_path, options)
+            finally:
+                # Only remove files we downloaded, never a caller's local path
+                if is_temp:
+                    os.unlink(document_path)
 
             return result
 
@@ -141,52 +340,93 @@ class DocumentAnalyzer:
                 "traceback": traceback.format_exc()
             }
 
-    def _download_document(self, url: str) -> str:
-        """Download document from URL"""
+    def analyze_documents(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analyze a batch of documents, downloading all of them concurrently first
+
+        Args:
+            config: Configuration with a "urls" list and "options" shared by every document
+
+        Returns:
+            Dictionary with one analyze_document result per URL, in order
+        """
+        urls = config.get("urls") or []
+        options = config.get("options", {})
+
+        if AIOHTTP_AVAILABLE:
+            downloads = asyncio.run(_download_many(urls))
+        else:
+            downloads = [None] * len(urls)
+
+        results = []
+        for url, download in zip(urls, downloads):
+            if isinstance(download, Exception):
+                results.append({
+                    "success": False,
+                    "error": str(download)
+                })
+            else:
+                results.append(self.analyze_document({"document_url": url, "options": options}, download))
+
+        return {"success": True, "results": results}
+
+    def _get_session(self) -> Any:
+        """Return the shared HTTP session, creating it on first download"""
+        if self.session is None:
+            self.session = _create_session()
+        return self.session
+
+    def _download_document(self, url: str) -> Tuple[str, bool]:
+        """Download document from URL, returning (path, is_temp)"""
         if not url.startswith('http'):
-            return url
+            return url, False
 
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+        # Stream to temp file
+        with self._get_session().get(url, stream=True, timeout=30) as response:
+            response.raise_for_status()
 
-        # Determine file extension
-        ext = '.pdf'
-        if '.pdf' in url.lower():
-            ext = '.pdf'
-        elif any(x in url.lower() for x in ['.png', '.jpg', '.jpeg']):
-            ext = '.jpg'
+            ext = _extension_for(response.headers.get('content-type', ''), url)
 
-        # Save to temp file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
-            tmp.write(response.content)
-            return tmp.name
+            # Let urllib3 undo any gzip/deflate transfer encoding on the raw stream
+            response.raw.decode_content = True
+            with tempfile.NamedTemporaryFile(delete=False, suffix=ext, dir=tempfile.gettempdir()) as tmp:
+                try:
+                    shutil.copyfileobj(response.raw, tmp, length=DOWNLOAD_CHUNK_SIZE)
+                except BaseException:
+                    tmp.close()
+                    os.unlink(tmp.name)
+                    raise
+                return tmp.name, True
 
     def _get_document_type(self, path: str) -> str:
         """Determine document type from path"""
-        path_lower = path.lower()
-        if path_lower.endswith('.pdf'):
-            return 'pdf'
-        elif any(path_lower.endswith(ext) for ext in ['.png', '.jpg', '.jpeg']):
-            return 'image'
-        return 'unknown'
+        return EXTENSION_FORMATS.get(_ext(path), 'unknown')
 
     def _process_pdf(self, path: str, options: Dict[str, Any]) -> Dict[str, Any]:
         """Process PDF document"""
-        text = ""
+        # Page chunks are joined once at the end instead of re-copying the growing string
+        text_parts = []
         tables = []
         metadata = {}
         pages_data = []
 
-        # Try pdfplumber first (best for tables)
-        if LIBRARIES_STATUS['pdfplumber']:
+        # pdfplumber builds a full character layout per page, so only pay for it when tables are wanted
+        extract_tables = options.get('extract_tables', options.get('table_detection', True))
+
+        # Read the file once; every parser below seeks within memory, and
+        # BytesIO over bytes shares the buffer instead of copying it
+        try:
+            data = Path(path).read_bytes()
+        except OSError:
+            data = b''
+        if self.pdfplumber is not None and (extract_tables or self.pypdf is None):
             try:
-                import pdfplumber
-                with pdfplumber.open(path) as pdf:
+                with self.pdfplumber.open(io.BytesIO(data)) as pdf:
                     metadata['page_count'] = len(pdf.pages)
 
                     for i, page in enumerate(pdf.pages):
                         page_text = page.extract_text() or ""
-                        text += f"\n--- Page {i+1} ---\n{page_text}"
+                        text_parts.append(f"\n--- Page {i+1} ---\n{page_text}")
 
                         # Extract tables
                         page_tables = page.extract_tables()
@@ -204,29 +444,29 @@ class DocumentAnalyzer:
                         })
 
             except Exception as e:
-                pass
+                logging.error("pdfplumber extraction failed: %s", e)
 
-        # Fallback to pypdf for text extraction
-        if not text and LIBRARIES_STATUS['pypdf']:
+        # pypdf for text-only extraction, or when pdfplumber found no text
+        if not text_parts and self.pypdf is not None:
             try:
-                import pypdf
-                reader = pypdf.PdfReader(path)
+                reader = self.pypdf.PdfReader(io.BytesIO(data))
                 metadata['page_count'] = len(reader.pages)
 
                 for i, page in enumerate(reader.pages):
                     page_text = page.extract_text()
-                    text += f"\n--- Page {i+1} ---\n{page_text}"
+                    text_parts.append(f"\n--- Page {i+1} ---\n{page_text}")
                     pages_data.append({
                         'page_number': i+1,
                         'text': page_text
                     })
-            except:
-                pass
+            except Exception as e:
+                logging.error("pypdf extraction failed: %s", e)
 
         # Try DeepDoctection if available and configured
         if LIBRARIES_STATUS['deepdoctection'] and options.get('use_deepdoctection', False):
             try:
-                with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):
+                dd = _load('deepdoctection')
+                with redirect_stdout(_DEVNULL), redirect_stderr(_DEVNULL):
                     # Use minimal configuration
                     analyzer = dd.get_dd_analyzer(config_overwrite={
                         "USE_OCR": False,
@@ -241,13 +481,13 @@ class DocumentAnalyzer:
                                     'type': 'deepdoctection',
                                     'data': str(table)
                                 })
-            except:
-                pass
+            except Exception as e:
+                logging.error("DeepDoctection table extraction failed: %s", e)
 
         return {
             "success": True,
             "document": {
-                "text": text,
+                "text": ''.join(text_parts),
                 "pages": len(pages_data),
                 "format": "pdf"
             },
@@ -261,23 +501,32 @@ class DocumentAnalyzer:
         """Process image document"""
         text = ""
         layout_elements = []
+        self._initialize_tools()
 
         # Use EasyOCR if available
-        if LIBRARIES_STATUS['easyocr'] and self.ocr_reader and options.get('ocr', True):
+        if self.ocr_reader is not None and options.get('ocr', True):
             try:
-                results = self.ocr_reader.readtext(path)
-                text_parts = []
-                for (bbox, text_content, prob) in results:
-                    if prob > 0.5:  # Confidence threshold
-                        text_parts.append(text_content)
-                text = ' '.join(text_parts)
-            except:
-                pass
+                paths = options.get('paths')
+                if isinstance(paths, list) and len(paths) > 1:
+                    # Batched inference needs equally sized inputs, so images are resized
+                    batches = self.ocr_reader.readtext_batched(
+                        paths, n_width=OCR_BATCH_SIZE_PX, n_height=OCR_BATCH_SIZE_PX, batch_size=OCR_BATCH_SIZE
+                    )
+                else:
+                    batches = [self.ocr_reader.readtext(path)]
+
+                # Confidence threshold
+                text = '\n\n'.join(
+                    ' '.join([text_content for (bbox, text_content, prob) in results if prob > 0.5])
+                    for results in batches
+                )
+            except Exception as e:
+                logging.error("EasyOCR failed: %s", e)
 
         # Use LayoutParser if available
-        if LIBRARIES_STATUS['layoutparser'] and self.layout_model:
+        if self.layout_model is not None:
             try:
-                import cv2
+                cv2 = _load('cv2')
                 image = cv2.imread(path)
                 layout = self.layout_model.detect(image)
 
@@ -287,8 +536,8 @@ class DocumentAnalyzer:
                         'coordinates': block.coordinates,
                         'score': float(block.score)
                     })
-            except:
-                pass
+            except Exception as e:
+                logging.error("LayoutParser detection failed: %s", e)
 
         return {
             "success": True,
@@ -309,7 +558,8 @@ class DocumentAnalyzer:
         try:
             with open(path, 'r', encoding='utf-8', errors='ignore') as f:
                 text = f.read()
-        except:
+        except Exception as e:
+            logging.error("Reading %s failed: %s", path, e)
             text = ""
 
         return {
@@ -325,8 +575,44 @@ class DocumentAnalyzer:
         }
 
 
+def serve():
+    """
+    Persistent mode: read one JSON config per stdin line and answer with one
+    JSON result per stdout line, keeping the OCR reader and layout model resident
+    """
+    faulthandler.enable()
+    analyzer = DocumentAnalyzer(compile_models=True)
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            config = _loads(line)
+            if "urls" in config:
+                result = analyzer.analyze_documents(config)
+            else:
+                result = analyzer.analyze_document(config)
+        except Exception as e:
+            # One bad document must not take the worker down
+            result = {
+                "success": False,
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }
+
+        _write_result(result)
+
+
 def main():
     """Main entry point"""
+    _silence_stdout()
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "--serve":
+        serve()
+        return
+
     try:
         if len(sys.argv) < 2:
             result = {
@@ -335,12 +621,15 @@ def main():
             }
         else:
             config_json = sys.argv[1]
-            config = json.loads(config_json)
+            config = _loads(config_json)
 
             analyzer = DocumentAnalyzer()
-            result = analyzer.analyze_document(config)
+            if "urls" in config:
+                result = analyzer.analyze_documents(config)
+            else:
+                result = analyzer.analyze_document(config)
 
-        print(json.dumps(result, ensure_ascii=False, indent=None))
+        _write_result(result)
 
     except Exception as e:
         error_result = {
@@ -348,7 +637,7 @@ def main():
             "error": str(e),
             "traceback": traceback.format_exc()
         }
-        print(json.dumps(error_result, ensure_ascii=False, indent=None))
+        _write_result(error_result)
         sys.exit(1)
 
 
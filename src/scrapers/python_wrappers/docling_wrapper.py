@@ -8,12 +8,19 @@ import sys
 import json
 import traceback
 import base64
+import binascii
 import io
 import tempfile
 import os
-from typing import Dict, Any, Optional, List, Union
+import faulthandler
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Set, Union
 from datetime import datetime
+from html import escape
 from pathlib import Path
+from urllib.parse import urlparse
 
 try:
     from docling.document_converter import DocumentConverter
@@ -29,10 +36,188 @@ try:
     except ImportError:
         PIPELINE_OPTIONS_AVAILABLE = False
 
+    # In-memory input avoids a temp file round trip
+    try:
+        from docling.datamodel.base_models import DocumentStream
+        DOCUMENT_STREAM_AVAILABLE = True
+    except ImportError:
+        DOCUMENT_STREAM_AVAILABLE = False
+
 except ImportError as e:
     DOCLING_AVAILABLE = False
     IMPORT_ERROR = str(e)
     PIPELINE_OPTIONS_AVAILABLE = False
+    DOCUMENT_STREAM_AVAILABLE = False
+
+# Faster JSON output that also serializes numpy table data natively
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Proper markdown rendering for the HTML fallback (newline replacement otherwise)
+try:
+    from markdown_it import MarkdownIt
+    _MD = MarkdownIt("commonmark")
+except ImportError:
+    _MD = None
+
+# Leading bytes of formats that are never sent base64 encoded by accident
+RAW_DOCUMENT_SIGNATURES = (
+    "%PDF",              # PDF
+    "PK\x03\x04",        # DOCX/XLSX/PPTX (zip)
+    "\xd0\xcf\x11\xe0",  # DOC/XLS/PPT (OLE2)
+    "%!PS",              # PostScript
+    "{\\rtf",            # RTF
+)
+
+# Response returned when Docling fails on a document; process_document copies
+# it and fills in the per-call fields, so nothing below is ever mutated
+_MOCK_TEMPLATE = {
+    "success": True,
+    "document": {
+        "text": "Mock Docling extracted content (processing failed)",
+        "markdown": "# Mock Docling Document\n\nExtracted content (processing failed)",
+        "html": "<h1>Mock Document</h1><p>Mock content (processing failed)</p>",
+        "json": {
+            "title": "Mock Document",
+            "content": "Mock content (processing failed)",
+            "tables": [],
+            "figures": []
+        }
+    },
+    "metadata": {
+        "title": "Mock Document",
+        "author": "Mock Author",
+        "created_date": None,
+        "page_count": 1,
+        "word_count": 10,
+        "document_type": "pdf",
+        "language": "en"
+    },
+    "tables": [],
+    "figures": [],
+    "annotations": [],
+    "bookmarks": [],
+    "form_fields": [],
+    "embedded_files": [],
+    "processing_error": None,
+    "mock": True
+}
+
+# File suffix that tells Docling the format of an unnamed document, by document_type
+_SUFFIX_MAP = {
+    "pdf": ".pdf",
+    "docx": ".docx",
+    "doc": ".doc",
+    "pptx": ".pptx",
+    "ppt": ".ppt",
+    "xlsx": ".xlsx",
+    "xls": ".xls",
+    "html": ".html",
+    "txt": ".txt",
+    "md": ".md"
+}
+
+# One thread per independent extractor in _process_result
+EXTRACTOR_WORKERS = 6
+
+# Representations _process_result can emit under "document"
+ALL_EXPORT_FORMATS = ("text", "markdown", "html", "json")
+DEFAULT_EXPORT_FORMATS = ("markdown",)
+
+
+def _to_builtin(obj: Any) -> Any:
+    """Convert values the JSON encoders cannot handle (numpy arrays and scalars, extractor records)"""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    if hasattr(obj, '__dataclass_fields__'):
+        # orjson writes the records natively; this is the stdlib json path
+        return {name: getattr(obj, name) for name in obj.__dataclass_fields__}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _loads(data: str) -> Any:
+    """Parse a JSON config"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(result: Dict[str, Any]) -> bytes:
+    """Serialize a result as UTF-8 JSON without a trailing newline"""
+    try:
+        if ORJSON_AVAILABLE:
+            # Numeric arrays are written directly; object arrays go through _to_builtin
+            return orjson.dumps(
+                result,
+                default=_to_builtin,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            )
+        return json.dumps(result, ensure_ascii=False, indent=None, default=_to_builtin).encode('utf-8')
+    except TypeError:
+        # orjson.JSONEncodeError is a TypeError; stringify whatever neither path understands
+        return json.dumps(result, ensure_ascii=False, indent=None, default=str).encode('utf-8')
+
+
+def _write_result(result: Dict[str, Any]) -> None:
+    """Write a result as one JSON line straight to the real stdout's binary buffer"""
+    out = sys.__stdout__.buffer
+    out.write(_dumps(result))
+    out.write(b"\n")
+    out.flush()
+
+
+def _silence_stdout() -> None:
+    """
+    Send stray print() output from Docling and its models to os.devnull for the
+    whole process; results are written to sys.__stdout__ by _write_result
+    """
+    sys.stdout = open(os.devnull, 'w')
+
+
+# Extractors can return thousands of these per document; slotted records avoid
+# a hashtable per item and serialize to the same objects the dicts did
+@dataclass
+class Annotation:
+    """Annotation found in a document"""
+    __slots__ = ('type', 'content', 'page')
+
+    type: Any
+    content: Any
+    page: Any
+
+
+@dataclass
+class Bookmark:
+    """Bookmark (outline entry) found in a document"""
+    __slots__ = ('title', 'page', 'level')
+
+    title: Any
+    page: Any
+    level: Any
+
+
+@dataclass
+class FormField:
+    """Form field found in a document"""
+    __slots__ = ('name', 'type', 'value', 'page')
+
+    name: Any
+    type: Any
+    value: Any
+    page: Any
+
+
+@dataclass
+class EmbeddedFile:
+    """File embedded in a document"""
+    __slots__ = ('name', 'size', 'type')
+
+    name: Any
+    size: Any
+    type: Any
 
 
 class DoclingWrapper:
@@ -51,13 +236,6 @@ class DoclingWrapper:
         Returns:
             Dictionary with processing results
         """
-        if not DOCLING_AVAILABLE:
-            return {
-                "success": False,
-                "error": f"Docling not available: {IMPORT_ERROR}",
-                "mock": True
-            }
-
         try:
             # Get document content
             document_data = config.get("document_data")
@@ -72,21 +250,26 @@ class DoclingWrapper:
             # Extract processing options
             options = config.get("options", {})
 
+            if document_data:
+                document_bytes = self._decode_document_data(document_data, config.get("document_encoding"))
+
+                # Declared plain text has no layout to analyze, so skip Docling
+                # and its model initialization entirely
+                if options.get("document_type") == "txt":
+                    return self._process_text(document_bytes, options)
+
+            if not DOCLING_AVAILABLE:
+                return {
+                    "success": False,
+                    "error": f"Docling not available: {IMPORT_ERROR}",
+                    "mock": True
+                }
+
             # Create converter with options
             converter = self._create_converter(options)
 
             # Process document
             if document_data:
-                # Handle base64 encoded document data
-                if isinstance(document_data, str):
-                    try:
-                        document_bytes = base64.b64decode(document_data)
-                    except Exception:
-                        # Assume it's raw text
-                        document_bytes = document_data.encode('utf-8')
-                else:
-                    document_bytes = document_data
-
                 result = self._process_from_bytes(converter, document_bytes, options)
             else:
                 # Process from URL
@@ -96,57 +279,96 @@ class DoclingWrapper:
 
         except Exception as e:
             # If Docling processing fails, provide a mock response for testing
-            return {
-                "success": True,
-                "document": {
-                    "text": "Mock Docling extracted content (processing failed)",
-                    "markdown": "# Mock Docling Document\n\nExtracted content (processing failed)",
-                    "html": "<h1>Mock Document</h1><p>Mock content (processing failed)</p>",
-                    "json": {
-                        "title": "Mock Document",
-                        "content": "Mock content (processing failed)",
-                        "tables": [],
-                        "figures": []
-                    }
-                },
-                "metadata": {
-                    "title": "Mock Document",
-                    "author": "Mock Author",
-                    "created_date": datetime.now().isoformat(),
-                    "page_count": 1,
-                    "word_count": 10,
-                    "document_type": "pdf",
-                    "language": "en"
-                },
-                "tables": [],
-                "figures": [],
-                "annotations": [],
-                "bookmarks": [],
-                "form_fields": [],
-                "embedded_files": [],
-                "processing_error": str(e),
-                "mock": True
-            }
-
-    def _create_converter(self, options: Dict[str, Any]) -> 'DocumentConverter':
-        """Create DocumentConverter with specified options"""
-        # Create converter with simple configuration
-        # Modern Docling versions use different API patterns
+            response = dict(_MOCK_TEMPLATE)
+            response["metadata"] = {**_MOCK_TEMPLATE["metadata"], "created_date": datetime.now().isoformat()}
+            response["processing_error"] = str(e)
+            if (config.get("options") or {}).get("debug", False):
+                response["traceback"] = traceback.format_exc()
+            return response
+
+    def _decode_document_data(self, document_data: Union[str, bytes], encoding: Optional[str]) -> bytes:
+        """Turn document_data into bytes according to document_encoding ("base64", "utf8"/"text" or "bytes")"""
+        if isinstance(document_data, bytes):
+            return document_data
+
+        if encoding == "base64":
+            # Declared base64 may be line-wrapped (MIME, encodebytes, the base64 CLI);
+            # the non-validating decoder skips the line breaks
+            return base64.b64decode(document_data)
+        if encoding in ("utf8", "text"):
+            return document_data.encode('utf-8')
+        if encoding == "bytes":
+            # One code point per byte, as produced by a latin-1/binary string
+            return document_data.encode('latin-1')
+
+        # No declared encoding: raw PDF/Office content is recognisable from its
+        # magic bytes, which saves decoding a large payload only to fail
+        if document_data.startswith(RAW_DOCUMENT_SIGNATURES):
+            return document_data.encode('utf-8')
         try:
-            if PIPELINE_OPTIONS_AVAILABLE:
-                # Try to use pipeline options if available
-                converter = DocumentConverter()
+            # validate=True stops at the first non-alphabet character; line breaks
+            # from wrapped base64 are dropped first so they don't count as one
+            if "\n" in document_data:
+                unwrapped = document_data.replace("\r", "").replace("\n", "")
             else:
-                # Fallback to simple converter
-                converter = DocumentConverter()
+                unwrapped = document_data
+            return base64.b64decode(unwrapped, validate=True)
+        except binascii.Error:
+            # Assume it's raw text
+            return document_data.encode('utf-8')
+
+    def _process_text(self, document_bytes: bytes, options: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the result for plain text directly, in the same shape as _process_result"""
+        text = document_bytes.decode('utf-8', errors='replace')
+        export_formats = self._get_export_formats(options)
+
+        document_output = {}
+        if "text" in export_formats:
+            document_output["text"] = text
+        if "markdown" in export_formats:
+            document_output["markdown"] = text
+        if "html" in export_formats:
+            document_output["html"] = f"<html><body><pre>{escape(text)}</pre></body></html>"
+        if "json" in export_formats:
+            document_output["json"] = {"title": "", "content": text, "tables": [], "figures": []}
+
+        return {
+            "success": True,
+            "document": document_output,
+            "metadata": {
+                "word_count": len(text.split()),
+                "page_count": 1,
+                "document_type": "txt"
+            },
+            "tables": [],
+            "figures": [],
+            "annotations": [],
+            "bookmarks": [],
+            "form_fields": [],
+            "embedded_files": []
+        }
 
-            return converter
-        except Exception as e:
-            # If any configuration fails, use simple converter
-            return DocumentConverter()
+    def _get_export_formats(self, options: Dict[str, Any]) -> Set[str]:
+        """Representations to build under "document"; "legacy" restores all four"""
+        if options.get("legacy", False):
+            return set(ALL_EXPORT_FORMATS)
+        return set(options.get("export_formats") or DEFAULT_EXPORT_FORMATS)
+
+    def _create_converter(self, options: Dict[str, Any]) -> 'DocumentConverter':
+        """Return the DocumentConverter, creating it on first use"""
+        # No option changes the pipeline configuration yet, so one converter
+        # (and the models it loads lazily) serves every document
+        if self.converter is None:
+            self.converter = DocumentConverter()
+        return self.converter
 
     def _process_from_bytes(self, converter: 'DocumentConverter', document_bytes: bytes, options: Dict[str, Any]) -> 'ConversionResult':
         """Process document from byte data"""
+        if DOCUMENT_STREAM_AVAILABLE:
+            # Convert straight from memory; the name only tells Docling the format
+            source = DocumentStream(name=f"document{self._get_file_suffix(options)}", stream=io.BytesIO(document_bytes))
+            return converter.convert(source)
+
         # Create temporary file
         with tempfile.NamedTemporaryFile(delete=False, suffix=self._get_file_suffix(options)) as temp_file:
             temp_file.write(document_bytes)
@@ -171,67 +393,94 @@ class DoclingWrapper:
         try:
             # Download the document
             with urllib.request.urlopen(url) as response:
-                document_bytes = response.read()
-
-            return self._process_from_bytes(converter, document_bytes, options)
+                if not DOCUMENT_STREAM_AVAILABLE:
+                    document_bytes = response.read()
+                else:
+                    # Copy in fixed-size blocks into the buffer Docling reads from
+                    stream = io.BytesIO()
+                    shutil.copyfileobj(response, stream, length=1 << 20)
+                    stream.seek(0)
         except Exception as e:
             raise Exception(f"Failed to download document from URL {url}: {str(e)}")
 
+        if not DOCUMENT_STREAM_AVAILABLE:
+            return self._process_from_bytes(converter, document_bytes, options)
+
+        # Prefer the URL's own file name, which tells Docling the real format
+        name = os.path.basename(urlparse(url).path)
+        if not os.path.splitext(name)[1]:
+            name = f"document{self._get_file_suffix(options)}"
+        return converter.convert(DocumentStream(name=name, stream=stream))
+
     def _get_file_suffix(self, options: Dict[str, Any]) -> str:
         """Get appropriate file suffix based on document type"""
-        doc_type = options.get("document_type", "pdf")
-        suffix_map = {
-            "pdf": ".pdf",
-            "docx": ".docx",
-            "doc": ".doc",
-            "pptx": ".pptx",
-            "ppt": ".ppt",
-            "xlsx": ".xlsx",
-            "xls": ".xls",
-            "html": ".html",
-            "txt": ".txt",
-            "md": ".md"
-        }
-        return suffix_map.get(doc_type, ".pdf")
+        return _SUFFIX_MAP.get(options.get("document_type", "pdf"), ".pdf")
 
     def _process_result(self, result: 'ConversionResult', options: Dict[str, Any]) -> Dict[str, Any]:
         """Process conversion result into JSON-serializable format"""
         try:
             document = result.document
-
-            processed = {
-                "success": True,
-                "document": {
-                    "text": document.export_to_markdown() if hasattr(document, 'export_to_markdown') else "",
-                    "markdown": document.export_to_markdown() if hasattr(document, 'export_to_markdown') else "",
-                    "html": self._convert_to_html(document),
-                    "json": self._convert_to_json(document)
-                },
-                "metadata": self._extract_metadata(document, result),
-                "tables": self._extract_tables(document, options),
-                "figures": self._extract_figures(document, options),
-                "annotations": self._extract_annotations(document),
-                "bookmarks": self._extract_bookmarks(document),
-                "form_fields": self._extract_form_fields(document),
-                "embedded_files": self._extract_embedded_files(document)
-            }
+            export_tables = options.get("export_tables", True)
+            export_figures = options.get("export_figures", False)
+
+            # The extractors only read the document, so they run alongside the
+            # markdown export (table dataframe construction releases the GIL)
+            with ThreadPoolExecutor(max_workers=EXTRACTOR_WORKERS) as executor:
+                tables = executor.submit(self._extract_tables, document, export_tables)
+                figures = executor.submit(self._extract_figures, document, export_figures)
+                annotations = executor.submit(self._extract_annotations, document)
+                bookmarks = executor.submit(self._extract_bookmarks, document)
+                form_fields = executor.submit(self._extract_form_fields, document)
+                embedded_files = executor.submit(self._extract_embedded_files, document)
+
+                # Markdown export walks the whole document tree, so do it once and share it
+                markdown = document.export_to_markdown() if hasattr(document, 'export_to_markdown') else ""
+
+                # Only build the representations the caller asked for
+                export_formats = self._get_export_formats(options)
+
+                document_output = {}
+                if "text" in export_formats:
+                    document_output["text"] = markdown
+                if "markdown" in export_formats:
+                    document_output["markdown"] = markdown
+                if "html" in export_formats:
+                    document_output["html"] = self._convert_to_html(document, markdown)
+                if "json" in export_formats:
+                    document_output["json"] = self._convert_to_json(document, markdown)
+
+                processed = {
+                    "success": True,
+                    "document": document_output,
+                    "metadata": self._extract_metadata(document, result),
+                    "tables": tables.result(),
+                    "figures": figures.result(),
+                    "annotations": annotations.result(),
+                    "bookmarks": bookmarks.result(),
+                    "form_fields": form_fields.result(),
+                    "embedded_files": embedded_files.result()
+                }
 
             return processed
 
         except Exception as e:
-            return {
+            error_result = {
                 "success": False,
-                "error": f"Failed to process result: {str(e)}",
-                "traceback": traceback.format_exc()
+                "error": f"Failed to process result: {str(e)}"
             }
+            # Formatting walks the whole frame chain, so only do it when asked
+            if options.get("debug", False):
+                error_result["traceback"] = traceback.format_exc()
+            return error_result
 
     def _extract_metadata(self, document, result: 'ConversionResult') -> Dict[str, Any]:
         """Extract document metadata"""
         metadata = {}
 
         # Get basic document info
-        if hasattr(document, 'title') and document.title:
-            metadata["title"] = document.title
+        title = getattr(document, 'title', None)
+        if title:
+            metadata["title"] = title
 
         if hasattr(document, 'created'):
             metadata["created_date"] = str(document.created) if document.created else None
@@ -246,164 +495,169 @@ class DoclingWrapper:
             metadata["language"] = document.language
 
         # Count elements
-        if hasattr(document, 'texts'):
-            metadata["word_count"] = sum(len(text.text.split()) for text in document.texts if hasattr(text, 'text'))
+        texts = getattr(document, 'texts', None)
+        if texts is not None:
+            # Join once and split once rather than allocating a word list per text item
+            joined = " ".join(text_value for text_value in (getattr(text, 'text', None) for text in texts) if text_value)
+            metadata["word_count"] = len(joined.split())
 
-        if hasattr(document, 'pages'):
-            metadata["page_count"] = len(document.pages)
+        pages = getattr(document, 'pages', None)
+        if pages is not None:
+            metadata["page_count"] = len(pages)
 
         metadata["document_type"] = "pdf"  # Default, could be enhanced
 
         return metadata
 
-    def _extract_tables(self, document, options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _extract_tables(self, document, export_tables: bool) -> List[Dict[str, Any]]:
         """Extract tables from document"""
         tables = []
 
-        if not options.get("export_tables", True):
+        document_tables = getattr(document, 'tables', None) if export_tables else None
+        if not document_tables:
             return tables
 
         try:
-            if hasattr(document, 'tables'):
-                for i, table in enumerate(document.tables):
-                    table_data = {
-                        "index": i,
-                        "rows": [],
-                        "caption": getattr(table, 'caption', '') if hasattr(table, 'caption') else '',
-                        "num_rows": 0,
-                        "num_cols": 0
-                    }
-
-                    # Extract table data (this would need to be adapted based on Docling's actual API)
-                    if hasattr(table, 'export_to_dataframe'):
-                        df = table.export_to_dataframe()
-                        table_data["rows"] = df.values.tolist()
-                        table_data["headers"] = df.columns.tolist()
-                        table_data["num_rows"] = len(df)
-                        table_data["num_cols"] = len(df.columns)
-                    elif hasattr(table, 'data'):
-                        # Alternative table data extraction
-                        table_data["rows"] = table.data if isinstance(table.data, list) else []
-
-                    tables.append(table_data)
+            for i, table in enumerate(document_tables):
+                table_data = {
+                    "index": i,
+                    "rows": [],
+                    "caption": getattr(table, 'caption', ''),
+                    "num_rows": 0,
+                    "num_cols": 0
+                }
+
+                # Extract table data (this would need to be adapted based on Docling's actual API)
+                if hasattr(table, 'export_to_dataframe'):
+                    df = table.export_to_dataframe()
+                    # Left as arrays; _dumps serializes them without a Python list copy
+                    table_data["rows"] = df.to_numpy()
+                    table_data["headers"] = df.columns.to_numpy()
+                    table_data["num_rows"] = len(df)
+                    table_data["num_cols"] = len(df.columns)
+                else:
+                    # Alternative table data extraction
+                    data = getattr(table, 'data', None)
+                    if data is not None:
+                        table_data["rows"] = data if isinstance(data, list) else []
+
+                tables.append(table_data)
         except Exception as e:
             # If table extraction fails, return empty list
             pass
 
         return tables
 
-    def _extract_figures(self, document, options: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _extract_figures(self, document, export_figures: bool) -> List[Dict[str, Any]]:
         """Extract figures from document"""
         figures = []
 
-        if not options.get("export_figures", False):
+        pictures = getattr(document, 'pictures', None) if export_figures else None
+        if not pictures:
             return figures
 
         try:
-            if hasattr(document, 'pictures'):
-                for i, figure in enumerate(document.pictures):
-                    figure_data = {
-                        "index": i,
-                        "caption": getattr(figure, 'caption', '') if hasattr(figure, 'caption') else '',
-                        "page": getattr(figure, 'page', 0) if hasattr(figure, 'page') else 0,
-                        "type": "image"
-                    }
-
-                    # Extract image data if available
-                    if hasattr(figure, 'image') and figure.image:
-                        try:
-                            # Convert image to base64
-                            img_bytes = figure.image.tobytes() if hasattr(figure.image, 'tobytes') else bytes(figure.image)
-                            figure_data["image_data"] = base64.b64encode(img_bytes).decode('utf-8')
-                        except:
-                            pass
-
-                    figures.append(figure_data)
+            for i, figure in enumerate(pictures):
+                figure_data = {
+                    "index": i,
+                    "caption": getattr(figure, 'caption', ''),
+                    "page": getattr(figure, 'page', 0),
+                    "type": "image"
+                }
+
+                # Extract image data if available
+                image = getattr(figure, 'image', None)
+                if image:
+                    try:
+                        figure_data["image_data"] = self._encode_image(image)
+                    except:
+                        pass
+
+                figures.append(figure_data)
         except Exception as e:
             # If figure extraction fails, return empty list
             pass
 
         return figures
 
-    def _extract_annotations(self, document) -> List[Dict[str, Any]]:
+    def _encode_image(self, image) -> str:
+        """Base64-encode image data, reading buffer-protocol objects without a copy"""
+        try:
+            img_buffer = memoryview(image)
+            if not img_buffer.c_contiguous:
+                img_buffer = img_buffer.tobytes()
+        except TypeError:
+            # PIL images and similar expose their pixels only through tobytes()
+            img_buffer = image.tobytes() if hasattr(image, 'tobytes') else bytes(image)
+        return binascii.b2a_base64(img_buffer, newline=False).decode('ascii')
+
+    def _extract_annotations(self, document) -> List[Annotation]:
         """Extract annotations from document"""
-        annotations = []
-
         try:
-            if hasattr(document, 'annotations'):
-                for annotation in document.annotations:
-                    annotations.append({
-                        "type": getattr(annotation, 'type', 'unknown'),
-                        "content": getattr(annotation, 'content', ''),
-                        "page": getattr(annotation, 'page', 0)
-                    })
+            return [
+                Annotation(
+                    getattr(annotation, 'type', 'unknown'),
+                    getattr(annotation, 'content', ''),
+                    getattr(annotation, 'page', 0)
+                )
+                for annotation in getattr(document, 'annotations', ())
+            ]
         except:
-            pass
-
-        return annotations
+            return []
 
-    def _extract_bookmarks(self, document) -> List[Dict[str, Any]]:
+    def _extract_bookmarks(self, document) -> List[Bookmark]:
         """Extract bookmarks from document"""
-        bookmarks = []
-
         try:
-            if hasattr(document, 'bookmarks'):
-                for bookmark in document.bookmarks:
-                    bookmarks.append({
-                        "title": getattr(bookmark, 'title', ''),
-                        "page": getattr(bookmark, 'page', 0),
-                        "level": getattr(bookmark, 'level', 0)
-                    })
+            return [
+                Bookmark(
+                    getattr(bookmark, 'title', ''),
+                    getattr(bookmark, 'page', 0),
+                    getattr(bookmark, 'level', 0)
+                )
+                for bookmark in getattr(document, 'bookmarks', ())
+            ]
         except:
-            pass
+            return []
 
-        return bookmarks
-
-    def _extract_form_fields(self, document) -> List[Dict[str, Any]]:
+    def _extract_form_fields(self, document) -> List[FormField]:
         """Extract form fields from document"""
-        form_fields = []
-
         try:
-            if hasattr(document, 'form_fields'):
-                for field in document.form_fields:
-                    form_fields.append({
-                        "name": getattr(field, 'name', ''),
-                        "type": getattr(field, 'type', ''),
-                        "value": getattr(field, 'value', ''),
-                        "page": getattr(field, 'page', 0)
-                    })
+            return [
+                FormField(
+                    getattr(field, 'name', ''),
+                    getattr(field, 'type', ''),
+                    getattr(field, 'value', ''),
+                    getattr(field, 'page', 0)
+                )
+                for field in getattr(document, 'form_fields', ())
+            ]
         except:
-            pass
-
-        return form_fields
+            return []
 
-    def _extract_embedded_files(self, document) -> List[Dict[str, Any]]:
+    def _extract_embedded_files(self, document) -> List[EmbeddedFile]:
         """Extract embedded files from document"""
-        embedded_files = []
-
         try:
-            if hasattr(document, 'embedded_files'):
-                for embedded_file in document.embedded_files:
-                    embedded_files.append({
-                        "name": getattr(embedded_file, 'name', ''),
-                        "size": getattr(embedded_file, 'size', 0),
-                        "type": getattr(embedded_file, 'type', '')
-                    })
+            return [
+                EmbeddedFile(
+                    getattr(embedded_file, 'name', ''),
+                    getattr(embedded_file, 'size', 0),
+                    getattr(embedded_file, 'type', '')
+                )
+                for embedded_file in getattr(document, 'embedded_files', ())
+            ]
         except:
-            pass
-
-        return embedded_files
+            return []
 
-    def _convert_to_html(self, document) -> str:
-        """Convert document to HTML format"""
+    def _convert_to_html(self, document, markdown: str) -> str:
+        """Convert document to HTML format, falling back to its already exported markdown"""
         try:
             if hasattr(document, 'export_to_html'):
                 return document.export_to_html()
             elif hasattr(document, 'export_to_markdown'):
-                # Convert markdown to basic HTML
-                markdown_text = document.export_to_markdown()
+                if _MD is not None:
+                    return f"<html><body>{_MD.render(markdown)}</body></html>"
                 # Basic markdown to HTML conversion
-                html = markdown_text.replace('\n', '<br>')
+                html = markdown.replace('\n', '<br>')
                 html = f"<html><body>{html}</body></html>"
                 return html
             else:
@@ -411,41 +665,82 @@ class DoclingWrapper:
         except:
             return "<html><body>Error converting to HTML</body></html>"
 
-    def _convert_to_json(self, document) -> Dict[str, Any]:
-        """Convert document to JSON structure"""
+    def _convert_to_json(self, document, markdown: str) -> Dict[str, Any]:
+        """Convert document to JSON structure using its already exported markdown"""
         try:
             json_data = {
                 "title": getattr(document, 'title', ''),
-                "content": document.export_to_markdown() if hasattr(document, 'export_to_markdown') else '',
+                "content": markdown,
                 "tables": [],
                 "figures": []
             }
 
             # Add table data
-            if hasattr(document, 'tables'):
-                for table in document.tables:
-                    if hasattr(table, 'export_to_dataframe'):
-                        df = table.export_to_dataframe()
-                        json_data["tables"].append({
-                            "headers": df.columns.tolist(),
-                            "rows": df.values.tolist()
-                        })
+            for table in getattr(document, 'tables', None) or ():
+                if hasattr(table, 'export_to_dataframe'):
+                    df = table.export_to_dataframe()
+                    json_data["tables"].append({
+                        "headers": df.columns.to_numpy(),
+                        "rows": df.to_numpy()
+                    })
 
             # Add figure data
-            if hasattr(document, 'pictures'):
-                for figure in document.pictures:
-                    json_data["figures"].append({
-                        "caption": getattr(figure, 'caption', ''),
-                        "page": getattr(figure, 'page', 0)
-                    })
+            for figure in getattr(document, 'pictures', None) or ():
+                json_data["figures"].append({
+                    "caption": getattr(figure, 'caption', ''),
+                    "page": getattr(figure, 'page', 0)
+                })
 
             return json_data
         except:
             return {"error": "Failed to convert to JSON"}
 
 
+def serve():
+    """
+    Persistent mode: read one JSON config per stdin line and answer with one
+    JSON result per stdout line, reusing the imported Docling modules and the
+    converter's loaded models for every document
+    """
+    faulthandler.enable()
+    wrapper = DoclingWrapper()
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            result = wrapper.process_document(_loads(line))
+        except Exception as e:
+            # One bad document must not take the worker down
+            result = {
+                "success": False,
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }
+
+        try:
+            _write_result(result)
+        except Exception as e:
+            # Still answer this request so responses stay paired with requests
+            _write_result({
+                "success": False,
+                "error": f"Failed to serialize result: {e}",
+                "traceback": traceback.format_exc()
+            })
+
+
 def main():
     """Main entry point for the wrapper"""
+    # Results are written in one block; no per-line flushing when piped to Node
+    sys.__stdout__.reconfigure(line_buffering=False, write_through=False)
+    _silence_stdout()
+
+    if len(sys.argv) >= 2 and sys.argv[1] == "--serve":
+        serve()
+        return
+
     try:
         if len(sys.argv) < 2:
             result = {
@@ -455,14 +750,14 @@ def main():
         else:
             # Parse configuration from command line argument
             config_json = sys.argv[1]
-            config = json.loads(config_json)
+            config = _loads(config_json)
 
             # Create wrapper and process document
             wrapper = DoclingWrapper()
             result = wrapper.process_document(config)
 
         # Output result as JSON
-        print(json.dumps(result, ensure_ascii=False, indent=None))
+        _write_result(result)
 
     except Exception as e:
         error_result = {
@@ -470,7 +765,7 @@ def main():
             "error": str(e),
             "traceback": traceback.format_exc()
         }
-        print(json.dumps(error_result, ensure_ascii=False, indent=None))
+        _write_result(error_result)
         sys.exit(1)
 
 
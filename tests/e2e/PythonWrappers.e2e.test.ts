@@ -17,6 +17,7 @@ import {
 import { DeepDoctectionContractValidator } from '../../src/interfaces/IPythonWrapperContracts';
 import * as fs from 'fs/promises';
 import * as path from 'path';
+import * as os from 'os';
 import { pythonEnv } from '../utils/PythonEnvironment';
 import {
   setupE2EEnvironment,
@@ -261,6 +262,96 @@ print('{"result": "done"}')
     }, 30000);
   });
 
+  describe('Crawl4AI Wrapper Result Streaming', () => {
+    const wrapperDir = path.resolve(__dirname, '../../src/scrapers/python_wrappers');
+
+    // Runs _process_result on a stub CrawlResult, so only Python itself is required
+    const processStubResult = (streamDir: string, threshold: number) => new PythonBridge().executeCode(`
+import base64
+import json
+import sys
+sys.path.insert(0, ${JSON.stringify(wrapperDir)})
+from crawl4ai_wrapper import Crawl4AIWrapper
+
+class StubResult:
+    success = True
+    url = "https://example.com"
+    html = "<p>" + "x" * 200 + "</p>"
+    cleaned_html = "<p>small</p>"
+    markdown = "# Example"
+    screenshot = base64.b64encode(b"png-bytes").decode("ascii")
+
+config = {"stream_dir": ${JSON.stringify(streamDir)}, "stream_threshold": ${threshold}}
+print(json.dumps(Crawl4AIWrapper()._process_result(StubResult(), config)))
+`);
+
+    runIfPython('should write oversized HTML and screenshots to stream_dir', async () => {
+      const streamDir = await fs.mkdtemp(path.join(os.tmpdir(), 'crawl4ai-stream-'));
+
+      try {
+        const result = await processStubResult(streamDir, 100);
+
+        expect(result.success).toBe(true);
+        expect(result.data.success).toBe(true);
+
+        // Large field moved to a file, small field kept inline
+        expect(result.data.html).toBeUndefined();
+        expect(result.data.html_size).toBe(207);
+        expect(path.dirname(result.data.html_path)).toBe(streamDir);
+        expect(await fs.readFile(result.data.html_path, 'utf-8')).toBe('<p>' + 'x'.repeat(200) + '</p>');
+        expect(result.data.cleaned_html).toBe('<p>small</p>');
+        expect(result.data.markdown).toBe('# Example');
+
+        // Screenshot stored as raw PNG bytes rather than base64
+        expect(result.data.screenshot).toBeNull();
+        expect(await fs.readFile(result.data.screenshot_path, 'utf-8')).toBe('png-bytes');
+        expect((await fs.readdir(streamDir)).length).toBe(2);
+      } finally {
+        await fs.rm(streamDir, { recursive: true, force: true });
+      }
+    });
+
+    runIfPython('should keep fields inline below the stream threshold', async () => {
+      const streamDir = await fs.mkdtemp(path.join(os.tmpdir(), 'crawl4ai-stream-'));
+
+      try {
+        const result = await processStubResult(streamDir, 1000);
+
+        expect(result.data.success).toBe(true);
+        expect(result.data.html).toBe('<p>' + 'x'.repeat(200) + '</p>');
+        expect(result.data.html_path).toBeUndefined();
+        expect(await fs.readdir(streamDir)).toEqual([expect.stringMatching(/\.png$/)]);
+      } finally {
+        await fs.rm(streamDir, { recursive: true, force: true });
+      }
+    });
+
+    runIfPython('should detect a closed browser from error_message', async () => {
+      const result = await new PythonBridge().executeCode(`
+import json
+import sys
+sys.path.insert(0, ${JSON.stringify(wrapperDir)})
+from crawl4ai_wrapper import Crawl4AIWrapper
+
+class StubResult:
+    success = False
+    url = "https://example.com"
+    error_message = "Target page, context or browser has been closed"
+
+wrapper = Crawl4AIWrapper()
+processed = wrapper._process_result(StubResult(), {})
+print(json.dumps({
+    "single": wrapper._browser_closed(processed),
+    "batch": wrapper._browser_closed({"success": True, "results": [processed]}),
+    "healthy": wrapper._browser_closed({"success": True, "results": [{"success": True, "error_message": None}]})
+}))
+`);
+
+      expect(result.success).toBe(true);
+      expect(result.data).toEqual({ single: true, batch: true, healthy: false });
+    });
+  });
+
   describe('DeepDoctection Wrapper E2E', () => {
     const runIfDeepDoctection = (name: string, fn: () => void | Promise<void>, timeout?: number) => {
       test(name, async () => {
@@ -0,0 +1,190 @@
+/**
+ * Unit tests for PersistentPythonBridge
+ */
+
+import { EventEmitter } from 'events';
+import { PassThrough } from 'stream';
+import { spawn } from 'child_process';
+import { PersistentPythonBridge } from '../../../src/scrapers/PersistentPythonBridge';
+import { PythonBridge } from '../../../src/scrapers/PythonBridge';
+
+jest.mock('child_process', () => ({
+  spawn: jest.fn()
+}));
+
+class FakeChild extends EventEmitter {
+  stdin = new PassThrough();
+  stdout = new PassThrough();
+  stderr = new PassThrough();
+  kill = jest.fn(() => {
+    this.emit('close', null);
+    return true;
+  });
+}
+
+/**
+ * Fake worker answering each JSON line with {"echo": <request>}
+ */
+function createEchoChild(): FakeChild {
+  const child = new FakeChild();
+  let buffer = '';
+  child.stdin.on('data', (data: Buffer) => {
+    buffer += data.toString();
+    let index: number;
+    while ((index = buffer.indexOf('\n')) !== -1) {
+      const line = buffer.slice(0, index);
+      buffer = buffer.slice(index + 1);
+      child.stdout.write(JSON.stringify({ echo: JSON.parse(line) }) + '\n');
+    }
+  });
+  return child;
+}
+
+/**
+ * Fake worker answering one JSON line at a time, each after delayMs
+ */
+function createSlowEchoChild(delayMs: number): FakeChild {
+  const child = new FakeChild();
+  const queue: string[] = [];
+  let buffer = '';
+  let busy = false;
+
+  const next = () => {
+    const line = queue.shift();
+    if (line === undefined) {
+      busy = false;
+      return;
+    }
+    busy = true;
+    setTimeout(() => {
+      child.stdout.write(JSON.stringify({ echo: JSON.parse(line) }) + '\n');
+      next();
+    }, delayMs);
+  };
+
+  child.stdin.on('data', (data: Buffer) => {
+    buffer += data.toString();
+    let index: number;
+    while ((index = buffer.indexOf('\n')) !== -1) {
+      queue.push(buffer.slice(0, index));
+      buffer = buffer.slice(index + 1);
+    }
+    if (!busy) {
+      next();
+    }
+  });
+  return child;
+}
+
+describe('PersistentPythonBridge', () => {
+  const mockSpawn = spawn as unknown as jest.Mock;
+  let bridge: PersistentPythonBridge;
+
+  beforeEach(() => {
+    mockSpawn.mockReset();
+    bridge = new PersistentPythonBridge({ pythonPath: 'python' });
+  });
+
+  afterEach(async () => {
+    await bridge.close();
+  });
+
+  it('should be substitutable for PythonBridge', () => {
+    expect(bridge).toBeInstanceOf(PythonBridge);
+  });
+
+  it('should spawn the wrapper once in serve mode and reuse it', async () => {
+    mockSpawn.mockImplementation(() => createEchoChild());
+
+    const first = await bridge.execute('wrapper.py', [{ url: 'https://a.example' }]);
+    const second = await bridge.execute('wrapper.py', [{ url: 'https://b.example' }]);
+
+    expect(mockSpawn).toHaveBeenCalledTimes(1);
+    expect(mockSpawn.mock.calls[0][1]).toEqual(['wrapper.py', '--serve']);
+    expect(first.success).toBe(true);
+    expect(first.data).toEqual({ echo: { url: 'https://a.example' } });
+    expect(second.data).toEqual({ echo: { url: 'https://b.example' } });
+    expect(bridge.getWorkerCount()).toBe(1);
+  });
+
+  it('should match concurrent requests to responses in order', async () => {
+    mockSpawn.mockImplementation(() => createEchoChild());
+
+    const results = await Promise.all([
+      bridge.execute('wrapper.py', [{ id: 1 }]),
+      bridge.execute('wrapper.py', [{ id: 2 }]),
+      bridge.execute('wrapper.py', [{ id: 3 }])
+    ]);
+
+    expect(results.map(r => r.data.echo.id)).toEqual([1, 2, 3]);
+  });
+
+  it('should report worker exit and respawn on the next call', async () => {
+    const dying = new FakeChild();
+    mockSpawn.mockImplementationOnce(() => dying).mockImplementation(() => createEchoChild());
+
+    const pending = bridge.execute('wrapper.py', [{ id: 1 }]);
+    dying.emit('close', 1);
+    const failed = await pending;
+
+    expect(failed.success).toBe(false);
+    expect(failed.error).toContain('exited with code 1');
+    expect(bridge.getWorkerCount()).toBe(0);
+
+    const retried = await bridge.execute('wrapper.py', [{ id: 2 }]);
+    expect(retried.success).toBe(true);
+    expect(mockSpawn).toHaveBeenCalledTimes(2);
+  });
+
+  it('should time out and kill a stuck worker', async () => {
+    const stuck = new FakeChild();
+    mockSpawn.mockImplementation(() => stuck);
+
+    const result = await bridge.execute('wrapper.py', [{ id: 1 }], { timeout: 10 });
+
+    expect(result.success).toBe(false);
+    expect(result.error).toContain('timed out after 10ms');
+    expect(stuck.kill).toHaveBeenCalled();
+    expect(bridge.getWorkerCount()).toBe(0);
+  });
+
+  it('should only start the timeout once a queued request reaches the worker', async () => {
+    mockSpawn.mockImplementation(() => createSlowEchoChild(30));
+
+    // Each request takes 30ms, so the last one waits 60ms behind the others
+    const results = await Promise.all([1, 2, 3].map(id =>
+      bridge.execute('wrapper.py', [{ id }], { timeout: 50 })
+    ));
+
+    expect(results.map(r => r.success)).toEqual([true, true, true]);
+    expect(results.map(r => r.data.echo.id)).toEqual([1, 2, 3]);
+    expect(bridge.getWorkerCount()).toBe(1);
+  });
+
+  it('should decode multi-byte characters split across output chunks', async () => {
+    const child = new FakeChild();
+    mockSpawn.mockImplementation(() => child);
+
+    const pending = bridge.execute('wrapper.py', [{}]);
+    const bytes = Buffer.from(JSON.stringify({ text: 'héllo €' }) + '\n', 'utf8');
+    const split = bytes.indexOf(0xe2) + 1; // inside the three-byte euro sign
+    child.stdout.write(bytes.subarray(0, split));
+    child.stdout.write(bytes.subarray(split));
+    const result = await pending;
+
+    expect(result.success).toBe(true);
+    expect(result.data).toEqual({ text: 'héllo €' });
+  });
+
+  it('should surface unparsable output as an error result', async () => {
+    const child = new FakeChild();
+    mockSpawn.mockImplementation(() => child);
+
+    const pending = bridge.execute('wrapper.py', [{}]);
+    child.stdout.write('not json\n');
+    const result = await pending;
+
+    expect(result.success).toBe(false);
+    expect(result.error).toContain('Failed to parse Python output as JSON');
+  });
+});